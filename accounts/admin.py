@@ -36,6 +36,13 @@ class UserAdmin(BaseUserAdmin):
             "Important dates",
             {"fields": ("last_login", "date_joined", "created_at", "updated_at")},
         ),
+        (
+            "Statistics",
+            {
+                "fields": ("posts_count", "published_posts_count", "comments_count"),
+                "classes": ("collapse",),
+            },
+        ),
     )
 
     add_fieldsets = (
@@ -48,4 +55,10 @@ class UserAdmin(BaseUserAdmin):
         ),
     )
 
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = (
+        "created_at",
+        "updated_at",
+        "posts_count",
+        "published_posts_count",
+        "comments_count",
+    )
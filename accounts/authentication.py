@@ -0,0 +1,68 @@
+from typing import Any, Optional
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework import permissions
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import Token
+
+from app_sheep.db_routing import read_from_primary
+
+from .user_cache import cache_user, get_cached_user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication, берущая пользователя из кеша вместо запроса к БД"""
+
+    def get_user(self, validated_token: Token) -> Any:
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        user = get_cached_user(validated_token[api_settings.USER_ID_CLAIM])
+        if user is None:
+            with read_from_primary():
+                user = super().get_user(validated_token)
+
+            cache_user(user)
+            return user
+
+        self.check_user(user, validated_token)
+        return user
+
+    def check_user(self, user: Any, validated_token: Token) -> None:
+        """
+        Те же проверки, что JWTAuthentication.get_user делает после загрузки,
+        для пользователя из кеша (вместо хеша пароля у него password_digest)
+        """
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        password_digest = validated_token.get(api_settings.REVOKE_TOKEN_CLAIM)
+        if api_settings.CHECK_REVOKE_TOKEN and password_digest != user.password_digest:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+
+
+class StatelessReadJWTAuthentication(CachedJWTAuthentication):
+    """
+    Для read-only представлений, которым нужен только id пользователя:
+    на безопасных методах request.user - TokenUser из самого токена.
+    """
+
+    def authenticate(self, request: Request) -> Optional[tuple[Any, Token]]:
+        self.stateless = request.method in permissions.SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token: Token) -> Any:
+        if not self.stateless:
+            return super().get_user(validated_token)
+
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        return api_settings.TOKEN_USER_CLASS(validated_token)
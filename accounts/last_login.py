@@ -0,0 +1,27 @@
+"""
+Обновление last_login без записи на каждый вход.
+
+Заменяет приемник user_logged_in из django.contrib.auth: last_login пишется
+не чаще раза в AUTH_LAST_LOGIN_INTERVAL секунд на пользователя и одним
+UPDATE, без save() - то есть без сигналов (сброс кеша пользователя, проверка
+аватара) и без изменения updated_at.
+"""
+
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.utils import timezone
+
+LAST_LOGIN_INTERVAL = getattr(settings, "AUTH_LAST_LOGIN_INTERVAL", 60 * 60)
+
+
+def update_last_login(sender: Any, user: Any, **kwargs: Any) -> None:
+    now = timezone.now()
+    if user.last_login is not None and now - user.last_login < timedelta(
+        seconds=LAST_LOGIN_INTERVAL,
+    ):
+        return
+
+    type(user)._default_manager.filter(pk=user.pk).update(last_login=now)
+    user.last_login = now
@@ -0,0 +1,37 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.utils import timezone
+
+from accounts.models import RevokedToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет пачками отзывы уже истекших JWT: такой токен отклоняется по "
+        "exp и без записи в revoked_tokens"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        expired = RevokedToken.objects.filter(expires_at__lte=timezone.now())
+        if options["dry_run"]:
+            self.stdout.write(f"Would delete {expired.count()} revoked tokens")
+            return
+
+        # Bloom-фильтры процессов забудут эти jti при очередной перестройке
+        deleted = 0
+        while True:
+            keys = list(expired.values_list("pk", flat=True)[: options["batch_size"]])
+            if not keys:
+                break
+
+            deleted += RevokedToken.objects.filter(pk__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} revoked tokens"))
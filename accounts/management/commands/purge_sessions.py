@@ -0,0 +1,62 @@
+from typing import Any
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет накопившиеся строки django_session пачками (по умолчанию - "
+        "истекшие, с --all - все), на PostgreSQL может выполнить VACUUM"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Удалить и действующие сессии (выйдут и пользователи админки)",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--vacuum",
+            action="store_true",
+            help="VACUUM ANALYZE django_session после удаления (PostgreSQL)",
+        )
+        parser.add_argument("--dry-run", action="store_true")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive")
+
+        sessions = Session.objects.all()
+        if not options["all"]:
+            sessions = sessions.filter(expire_date__lt=timezone.now())
+
+        if options["dry_run"]:
+            self.stdout.write(f"Would delete {sessions.count()} sessions")
+            return
+
+        # Короткие пачки по первичному ключу не держат блокировку на всю таблицу
+        deleted = 0
+        while True:
+            keys = list(
+                sessions.values_list("pk", flat=True)[: options["batch_size"]],
+            )
+            if not keys:
+                break
+
+            deleted += Session.objects.filter(pk__in=keys).delete()[0]
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} sessions"))
+
+        if options["vacuum"]:
+            if connection.vendor != "postgresql":
+                raise CommandError("--vacuum is supported on PostgreSQL only")
+
+            # Место от удаленных строк освобождает только VACUUM
+            with connection.cursor() as cursor:
+                cursor.execute(f"VACUUM ANALYZE {Session._meta.db_table}")
+
+            self.stdout.write(self.style.SUCCESS("Vacuumed django_session"))
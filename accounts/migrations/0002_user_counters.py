@@ -0,0 +1,58 @@
+# Generated by Django 5.2 on 2026-10-18 14:57
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_user_counters(apps, schema_editor):
+    User = apps.get_model("accounts", "User")
+    Post = apps.get_model("main", "Post")
+    Comment = apps.get_model("comments", "Comment")
+
+    def count_of(queryset):
+        return Coalesce(
+            Subquery(
+                queryset.filter(author=OuterRef("pk"))
+                .order_by()
+                .values("author")
+                .annotate(total=Count("pk"))
+                .values("total"),
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    User.objects.update(
+        posts_count=count_of(Post.objects.all()),
+        published_posts_count=count_of(Post.objects.filter(status="published")),
+        comments_count=count_of(Comment.objects.filter(is_active=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0001_initial"),
+        ("main", "0003_post_comments_count"),
+        ("comments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="user",
+            name="published_posts_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_user_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 15:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
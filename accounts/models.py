@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.core.validators import MaxValueValidator
 from django.contrib.auth.models import AbstractUser
 
+from .user_cache import invalidate_cached_users
+
 
 # class Accounts(models.Model):
 #     class Meta:
@@ -42,10 +46,16 @@ class User(AbstractUser):
     first_name = models.CharField(max_length=30, blank=True)
     last_name = models.CharField(max_length=30, blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    # Уменьшенные копии avatar (app_sheep.image_variants)
+    avatar_variants = models.JSONField(default=dict, blank=True, editable=False)
     bio = models.TextField(max_length=500, blank=True)
     created_at = models.DateTimeField(auto_now=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    # Денормализованная статистика автора, см. reconcile_counters
+    posts_count = models.PositiveIntegerField(default=0)
+    published_posts_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
 
     def __str__(self) -> str:
         return self.email
@@ -53,3 +63,32 @@ class User(AbstractUser):
     @property
     def full_name(self) -> str:
         return f"{self.first_name} {self.last_name}".strip()
+
+    @classmethod
+    def adjust_counter(cls, field: str, deltas: dict[int, int]) -> None:
+        """Атомарно сдвигает счетчик field: {user_id: delta}"""
+
+        changed = [user_id for user_id, delta in deltas.items() if delta]
+        for user_id in changed:
+            cls.objects.filter(pk=user_id).update(
+                **{field: Greatest(F(field) + deltas[user_id], 0)},
+            )
+
+        # update() не отправляет сигналы, а счетчики есть в кешированном профиле
+        invalidate_cached_users(changed)
+
+
+class RevokedToken(models.Model):
+    """Отозванный JWT по jti, хранится до истечения токена (accounts.revocation)"""
+
+    class Meta:
+        db_table = "revoked_tokens"
+        verbose_name = "Revoked token"
+        verbose_name_plural = "Revoked tokens"
+
+    jti = models.CharField(max_length=255, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return self.jti
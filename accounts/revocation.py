@@ -0,0 +1,266 @@
+"""
+Отзыв JWT: jti отозванных токенов с их сроком в таблице revoked_tokens и
+bloom-фильтр по ним в памяти процесса.
+
+Проверка токена сначала смотрит в фильтр: для неотозванного токена он почти
+всегда отвечает "нет" без запроса к БД, и только при положительном ответе
+(отозван или ложное срабатывание, доля FALSE_POSITIVE_RATE) jti ищется в
+таблице. Отзыв в этом процессе попадает в фильтр сразу, в других - через
+общую версию в кеше, которую процессы сверяют раз в SYNC_INTERVAL секунд и
+при изменении догружают новые jti. Если кеш "default" живет в памяти
+процесса (LocMemCache без REDIS_URL), версия других процессов не видна, и
+новые jti догружаются из таблицы каждые SYNC_INTERVAL секунд без сверки.
+
+Удалять из bloom-фильтра нельзя, поэтому он раз в REBUILD_INTERVAL
+строится заново в фоне только по неистекшим записям; истекшие строки
+удаляет prune_revoked_tokens.
+"""
+
+import hashlib
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from app_sheep.db_routing import read_from_primary
+
+DEFAULTS: dict[str, Any] = {
+    "EXPECTED_TOKENS": 1_000_000,
+    "FALSE_POSITIVE_RATE": 0.001,
+    "SYNC_INTERVAL": 1,
+    "REBUILD_INTERVAL": 60 * 60,
+    # Запас при догрузке: строки могли закоммититься не в порядке created_at
+    "SYNC_OVERLAP": 60,
+}
+
+VERSION_KEY = "auth:revocation:version"
+
+logger = logging.getLogger(__name__)
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "TOKEN_REVOCATION", {}).get(name, DEFAULTS[name])
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        self.size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class RevocationFilter:
+    """
+    Bloom-фильтр отозванных jti этого процесса. Плановая перестройка идет в
+    фоновом потоке, пока читатели пользуются старым фильтром; ждет сборки
+    только первое обращение в процессе.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._bloom: Optional[BloomFilter] = None
+        self._version: Any = None
+        self._built_at = 0.0
+        self._synced_at = 0.0
+        self._loaded_since: Optional[datetime] = None
+        self._rebuilding = False
+
+    def might_be_revoked(self, jti: str) -> bool:
+        self.sync()
+        return jti in self._bloom
+
+    def add(self, jti: str) -> None:
+        self.sync()
+        with self._lock:
+            self._bloom.add(jti)
+
+    def sync(self) -> None:
+        if self._bloom is None:
+            with self._lock:
+                if self._bloom is None:
+                    self._swap(*self._build())
+
+            return
+
+        now = time.monotonic()
+        if now - self._built_at >= get_setting("REBUILD_INTERVAL"):
+            self._start_rebuild()
+
+        if now - self._synced_at < get_setting("SYNC_INTERVAL"):
+            return
+
+        shared = _has_shared_cache()
+        version = cache.get(VERSION_KEY) if shared else None
+        with self._lock:
+            if now - self._synced_at < get_setting("SYNC_INTERVAL"):
+                return
+
+            self._synced_at = now
+            if shared and version == self._version:
+                return
+
+            self._loaded_since = self._load(
+                self._bloom,
+                self._loaded_since - timedelta(seconds=get_setting("SYNC_OVERLAP")),
+            )
+            self._version = version
+
+    def rebuild(self) -> None:
+        """Собирает фильтр заново и подменяет им текущий"""
+
+        self._swap(*self._build())
+
+    def _start_rebuild(self) -> None:
+        with self._lock:
+            if self._rebuilding:
+                return
+
+            self._rebuilding = True
+
+        threading.Thread(
+            target=self._rebuild_in_background,
+            name="revocation-filter-rebuild",
+            daemon=True,
+        ).start()
+
+    def _rebuild_in_background(self) -> None:
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception("Failed to rebuild the token revocation filter")
+            # Старый фильтр остается верным (лишние jti дают только промахи),
+            # следующая попытка - через REBUILD_INTERVAL
+            self._built_at = time.monotonic()
+        finally:
+            self._rebuilding = False
+            connections.close_all()
+
+    def _build(self) -> tuple[BloomFilter, Any, datetime]:
+        bloom = BloomFilter(
+            get_setting("EXPECTED_TOKENS"),
+            get_setting("FALSE_POSITIVE_RATE"),
+        )
+        # Версия до загрузки: отзыв во время сборки сменит ее, и sync догрузит
+        version = cache.get(VERSION_KEY)
+        return bloom, version, self._load(bloom)
+
+    def _swap(self, bloom: BloomFilter, version: Any, loaded_since: datetime) -> None:
+        with self._lock:
+            self._bloom, self._version = bloom, version
+            self._loaded_since = loaded_since
+            self._built_at = self._synced_at = time.monotonic()
+
+    def _load(self, bloom: BloomFilter, since: Optional[datetime] = None) -> datetime:
+        """Добавляет в bloom неистекшие jti (отозванные с since), возвращает метку"""
+
+        from .models import RevokedToken
+
+        loaded_since = timezone.now()
+        revoked = RevokedToken.objects.filter(expires_at__gt=loaded_since)
+        if since is not None:
+            revoked = revoked.filter(created_at__gte=since)
+
+        with read_from_primary():
+            for jti in revoked.values_list("jti", flat=True).iterator(
+                chunk_size=10000,
+            ):
+                bloom.add(jti)
+
+        return loaded_since
+
+
+revocation_filter = RevocationFilter()
+
+
+def _has_shared_cache() -> bool:
+    # Версию отзыва видят другие процессы только через общий кеш
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def _bump_version() -> None:
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+
+
+def is_revoked(jti: str) -> bool:
+    from .models import RevokedToken
+
+    if not revocation_filter.might_be_revoked(jti):
+        return False
+
+    # Реплика могла еще не получить свежий отзыв
+    with read_from_primary():
+        return RevokedToken.objects.filter(jti=jti).exists()
+
+
+def revoke_token(token: Token) -> None:
+    from .models import RevokedToken
+
+    jti = token[api_settings.JTI_CLAIM]
+    RevokedToken.objects.bulk_create(
+        [RevokedToken(jti=jti, expires_at=datetime_from_epoch(token["exp"]))],
+        ignore_conflicts=True,
+    )
+    revocation_filter.add(jti)
+    transaction.on_commit(_bump_version)
+
+
+class RevocationMixin:
+    """Для классов токенов simplejwt: проверка отзыва при verify()"""
+
+    def verify(self) -> None:
+        # Сначала дешевые проверки подписи и срока, отзыв - последним
+        super().verify()
+        if is_revoked(self[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is revoked"))
+
+    def blacklist(self) -> None:
+        # Имя метода, который вызывает TokenRefreshSerializer при ротации
+        revoke_token(self)
+
+
+class RevocableAccessToken(RevocationMixin, AccessToken):
+    pass
+
+
+class RevocableRefreshToken(RevocationMixin, RefreshToken):
+    access_token_class = RevocableAccessToken
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
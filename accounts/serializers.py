@@ -1,9 +1,10 @@
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.contrib.auth.password_validation import validate_password
 
 from accounts.models import User
+from app_sheep.image_variants import variant_urls
 
 # from models import Accounts
 # from django.utils.html import escape
@@ -80,29 +81,32 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "last_name",
             "full_name",
             "avatar",
+            "avatar_variants",
             "bio",
             "created_at",
             "updated_at",
             "posts_count",
+            "published_posts_count",
+            "comments_count",
+        )
+        read_only_fields = (
+            "id",
+            "created_at",
+            "updated_at",
+            "posts_count",
+            "published_posts_count",
             "comments_count",
         )
-        read_only_fields = ("id", "created_at", "updated_at")
 
     full_name = serializers.ReadOnlyField()
-    posts_count = serializers.SerializerMethodField()
-    comments_count = serializers.SerializerMethodField()
-
-    def get_posts_count(self, obj: User) -> int:
-        try:
-            return obj.posts.count()
-        except AttributeError:
-            return 0
+    avatar_variants = serializers.SerializerMethodField()
 
-    def get_comments_count(self, obj: User) -> int:
-        try:
-            return obj.comments.count()
-        except AttributeError:
-            return 0
+    def get_avatar_variants(self, obj: User) -> Optional[dict[str, Optional[str]]]:
+        return variant_urls(
+            obj.avatar,
+            obj.avatar_variants,
+            self.context.get("request"),
+        )
 
 
 class UserUpdateSerializers(serializers.ModelSerializer):
@@ -114,7 +118,9 @@ class UserUpdateSerializers(serializers.ModelSerializer):
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
-        instance.save
+        # instance - пользователь из кеша аутентификации: полный save() вернул
+        # бы в строку устаревшие счетчики
+        instance.save(update_fields=[*validated_data, "updated_at"])
         return instance
 
 
@@ -127,14 +133,13 @@ class ChangePasswordSerializers(serializers.Serializer):
     new_password_confirm = serializers.Serializer(required=True)
 
     def save(self) -> User:
-        user = self.context["request"].user
+        user = self.instance
         user.set_password(self.validated_data["new_password"])
-        user.save()
+        user.save(update_fields=["password", "updated_at"])
         return user
 
     def validate_old_password(self, value: User) -> User:
-        user = self.context["request"].user
-        if not user.check_password(value):
+        if not self.instance.check_password(value):
             raise serializers.ValidationError("Old password is incorrect.")
 
         return value
@@ -148,6 +153,10 @@ class ChangePasswordSerializers(serializers.Serializer):
         return attrs
 
 
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+
 # class AccountsSerializer(serializers.ModelSerializer):
 #     class Meta:
 #         models = Accounts
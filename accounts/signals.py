@@ -0,0 +1,28 @@
+from typing import Any
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from app_sheep.image_variants import schedule_variants, variants_ready
+from main.summaries import invalidate_summaries
+
+from .models import User
+from .user_cache import invalidate_cached_users
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender: type[User], instance: User, **kwargs: Any) -> None:
+    invalidate_cached_users([instance.pk])
+    invalidate_summaries(User, [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender: type[User], instance: User, **kwargs: Any) -> None:
+    schedule_variants(instance, "avatar", "avatar_variants")
+
+
+@receiver(variants_ready, sender=User)
+def avatar_variants_ready(sender: type[User], pk: int, **kwargs: Any) -> None:
+    invalidate_cached_users([pk])
+    invalidate_summaries(User, [pk])
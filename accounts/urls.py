@@ -14,5 +14,6 @@ urlpatterns = [
         views.ChangePasswordView.as_view(),
         name="change_password",
     ),
+    path("users/export/", views.UserExportView.as_view(), name="user-export"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
 ]
@@ -0,0 +1,40 @@
+"""
+Кеш пользователей для аутентификации по JWT (accounts.authentication).
+
+Запись сбрасывается после коммита при любом сохранении/удалении пользователя
+(профиль, смена пароля, админка) и при изменении его счетчиков. Хеш пароля в
+кеш не попадает: вместо него хранится password_digest для проверки
+CHECK_REVOKE_TOKEN. Закешированный объект может отставать на
+USER_CACHE_TIMEOUT, поэтому записывать его можно только с update_fields.
+"""
+
+import copy
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_TIMEOUT = getattr(settings, "AUTH_USER_CACHE_TIMEOUT", 60)
+
+
+def user_cache_key(user_id: Any) -> str:
+    return f"auth:user:v2:{user_id}"
+
+
+def get_cached_user(user_id: Any) -> Optional[Any]:
+    return cache.get(user_cache_key(user_id))
+
+
+def cache_user(user: Any) -> None:
+    cached = copy.copy(user)
+    cached.password_digest = get_md5_hash_password(user.password)
+    cached.set_unusable_password()
+    cache.set(user_cache_key(user.pk), cached, USER_CACHE_TIMEOUT)
+
+
+def invalidate_cached_users(user_ids: Iterable[Any]) -> None:
+    keys = [user_cache_key(user_id) for user_id in user_ids]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
@@ -2,20 +2,29 @@ from typing import Any, Type
 
 from rest_framework import generics, status, permissions, serializers
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.response import Response
 from rest_framework.request import Request
 
 
-from django.contrib.auth import login
+from django.contrib.auth.signals import user_logged_in
+
+from app_sheep.db_routing import read_from_primary
+from app_sheep.lean_api import NonAtomicReadsMixin
+from main.conditional import ConditionalGetMixin
+from main.export import StreamingExportView
 
 from .models import User
+from .revocation import RevocableRefreshToken, revoke_token
 from .serializers import (
     UserRegistrationSerializer,
     UserProfileSerializer,
     UserLoginSerializer,
     UserUpdateSerializers,
     ChangePasswordSerializers,
+    LogoutSerializer,
 )
 
 
@@ -57,7 +66,8 @@ class LoginView(generics.GenericAPIView):
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
 
-        login(request, user)
+        # Без login() и сессии: только JWT, last_login - см. accounts.last_login
+        user_logged_in.send(sender=user.__class__, request=request, user=user)
         refresh = RefreshToken.for_user(user)
 
         return Response(
@@ -71,13 +81,31 @@ class LoginView(generics.GenericAPIView):
         )
 
 
-class ProfileView(generics.RetrieveUpdateAPIView):
+class ProfileView(
+    NonAtomicReadsMixin,
+    ConditionalGetMixin,
+    generics.RetrieveUpdateAPIView,
+):
     serializer_class = UserProfileSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self) -> User:
         return self.request.user
 
+    def get_validator_row(self) -> dict[str, Any]:
+        # Пользователь уже загружен аутентификацией, запрос не нужен
+        user = self.request.user
+        return {
+            field: getattr(user, field)
+            for field in (
+                "pk",
+                "updated_at",
+                "posts_count",
+                "published_posts_count",
+                "comments_count",
+            )
+        }
+
     def get_serializer_class(self) -> Type[serializers.ModelSerializer]:
         if self.request.method == "PUT" or self.request.method == "PATCH":
             return UserUpdateSerializers
@@ -90,10 +118,12 @@ class ChangePasswordView(generics.UpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self) -> User:
-        return self.request.user
+        # У пользователя из кеша аутентификации нет хеша пароля
+        with read_from_primary():
+            return User.objects.get(pk=self.request.user.pk)
 
     def update(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        serializer = self.get_serializer(data=request.data)
+        serializer = self.get_serializer(self.get_object(), data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
 
@@ -105,20 +135,48 @@ class ChangePasswordView(generics.UpdateAPIView):
         )
 
 
+class UserExportView(StreamingExportView):
+    queryset = User.objects.all()
+    filterset_fields = ["is_active", "is_staff"]
+    export_name = "users"
+    export_fields = (
+        "id",
+        "username",
+        "email",
+        "first_name",
+        "last_name",
+        "bio",
+        "is_active",
+        "is_staff",
+        "date_joined",
+        "last_login",
+        "created_at",
+        "updated_at",
+    )
+
+
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def logout_view(request: Request) -> Response:
+    serializer = LogoutSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
     try:
-        refresh_token = RefreshToken.for_user("refresh_token")
+        refresh_token = serializer.validated_data.get("refresh")
         if refresh_token:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            token = RevocableRefreshToken(refresh_token)
+            if str(token[api_settings.USER_ID_CLAIM]) != str(request.user.pk):
+                raise TokenError("Token belongs to another user")
+
+            revoke_token(token)
+
+        # Текущий access-токен тоже перестает действовать
+        revoke_token(request.auth)
 
         return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
-    except Exception:
+    except TokenError:
         return Response(
             {
-                "error": "Invalid toke",
+                "error": "Invalid token",
             },
             status=status.HTTP_400_BAD_REQUEST,
         )
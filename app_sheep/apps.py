@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class AppSheepConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "app_sheep"
+
+    def ready(self) -> None:
+        from django.db.backends.signals import connection_created
+
+        from . import db_pool  # noqa: F401
+        from .instrumentation import (
+            get_setting,
+            install_query_timer,
+            instrument_serializers,
+        )
+
+        if get_setting("SAMPLE_RATE") > 0:
+            instrument_serializers()
+            connection_created.connect(install_query_timer)
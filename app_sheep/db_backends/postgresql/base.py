@@ -0,0 +1,9 @@
+"""PostgreSQL-бэкенд Django с учетом времени соединения (app_sheep.db_pool)"""
+
+from django.db.backends.postgresql import base
+
+from app_sheep.db_pool import ConnectTimingMixin
+
+
+class DatabaseWrapper(ConnectTimingMixin, base.DatabaseWrapper):
+    pass
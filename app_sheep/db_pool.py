@@ -0,0 +1,97 @@
+"""
+Статистика соединений с БД по процессу для подбора числа воркеров.
+
+С пулом psycopg 3 (OPTIONS["pool"], Django 5.1+) отдается get_stats()
+пула: размер, свободные соединения, очередь и время ожидания. С постоянными
+соединениями (CONN_MAX_AGE) пула нет - соединение живет в потоке, поэтому
+считаются открытые соединения, запросы в работе и сколько раз соединение
+пришлось открывать заново. Время установки соединения (с пулом - ожидание
+свободного) учитывает бэкенд app_sheep.db_backends.postgresql.
+"""
+
+import threading
+import time
+import weakref
+from collections import Counter
+from typing import Any
+
+from django.core.signals import request_finished, request_started
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_lock = threading.Lock()
+_counters: Counter[str] = Counter()
+_connect_seconds: Counter[str] = Counter()
+_wrappers: "weakref.WeakSet[BaseDatabaseWrapper]" = weakref.WeakSet()
+
+
+@receiver(request_started)
+def _request_started(**kwargs: Any) -> None:
+    with _lock:
+        _counters["requests"] += 1
+        _counters["requests_in_flight"] += 1
+
+
+@receiver(request_finished)
+def _request_finished(**kwargs: Any) -> None:
+    with _lock:
+        _counters["requests_in_flight"] -= 1
+
+
+@receiver(connection_created)
+def _connection_created(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    with _lock:
+        _counters[f"{connection.alias}:opened"] += 1
+        _wrappers.add(connection)
+
+
+class ConnectTimingMixin:
+    """Для DatabaseWrapper бэкенда: учитывает время connect() в pool_stats"""
+
+    def connect(self) -> None:
+        started = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            with _lock:
+                _connect_seconds[self.alias] += time.perf_counter() - started
+
+
+def pool_stats() -> dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+        connect_seconds = dict(_connect_seconds)
+        live = [wrapper for wrapper in _wrappers if wrapper.connection is not None]
+
+    stats: dict[str, Any] = {
+        "requests": counters.get("requests", 0),
+        "requests_in_flight": counters.get("requests_in_flight", 0),
+        "databases": {},
+    }
+    for alias in connections:
+        settings_dict = connections.settings[alias]
+        pool = getattr(connections[alias], "pool", None)
+        opened = counters.get(f"{alias}:opened", 0)
+        database: dict[str, Any] = {
+            "vendor": connections[alias].vendor,
+            "conn_max_age": settings_dict.get("CONN_MAX_AGE"),
+            "health_checks": settings_dict.get("CONN_HEALTH_CHECKS"),
+            "connections_opened": opened,
+            "connect_ms_total": round(connect_seconds.get(alias, 0) * 1000, 3),
+        }
+        if pool is not None:
+            database["mode"] = "pool"
+            database["pool"] = pool.get_stats()
+        else:
+            # Занятость соединений без пула не измерить: только открытые
+            persistent = bool(settings_dict.get("CONN_MAX_AGE"))
+            database.update(
+                mode="persistent" if persistent else "per-request",
+                open=sum(1 for wrapper in live if wrapper.alias == alias),
+            )
+
+        stats["databases"][alias] = database
+
+    return stats
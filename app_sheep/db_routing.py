@@ -0,0 +1,247 @@
+"""
+Чтение с реплик для безопасных API-запросов с закреплением за primary
+после записи (read-your-writes).
+
+ReplicaRoutingMiddleware выбирает для GET/HEAD/OPTIONS-запроса к API одну
+из реплик DATABASE_ROUTING["REPLICAS"], PrimaryReplicaRouter направляет
+туда чтения этого запроса. Запись всегда идет в default. После небезопасного
+запроса клиент на PIN_SECONDS закрепляется за primary: по cookie и по id
+пользователя из JWT (ключ в кеше), чтобы сразу видеть свои изменения
+несмотря на отставание реплик. Потоковые ответы (выгрузки) читают с той же
+реплики, пока отдается тело. Вне запросов (команды, задачи) все идет в
+default.
+"""
+
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+)
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, models
+from django.http import HttpRequest, HttpResponse
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULTS: dict[str, Any] = {
+    "REPLICAS": [],
+    "PIN_SECONDS": 5,
+    "PIN_COOKIE": "db_primary_pin",
+    "API_PREFIX": "/api/",
+}
+
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "DATABASE_ROUTING", {}).get(name, DEFAULTS[name])
+
+
+@contextmanager
+def read_from_primary() -> Iterator[None]:
+    """
+    Для наполнения общих кешей: данные, прочитанные с отстающей реплики,
+    прожили бы в кеше весь его TTL.
+    """
+
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def _pin_key(user_id: Any) -> str:
+    return f"db:primary_pin:{user_id}"
+
+
+def _token_user_id(request: HttpRequest) -> Optional[Any]:
+    """id пользователя из access-токена, без обращения к БД"""
+
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+
+    try:
+        token = authentication.get_validated_token(raw_token)
+    except (InvalidToken, TokenError):
+        return None
+
+    return token.get(jwt_settings.USER_ID_CLAIM)
+
+
+def is_pinned(request: HttpRequest) -> bool:
+    if get_setting("PIN_COOKIE") in request.COOKIES:
+        return True
+
+    user_id = _token_user_id(request)
+    return user_id is not None and bool(cache.get(_pin_key(user_id)))
+
+
+def pin_to_primary(request: HttpRequest, response: HttpResponse) -> None:
+    seconds = get_setting("PIN_SECONDS")
+    response.set_cookie(
+        get_setting("PIN_COOKIE"),
+        "1",
+        max_age=seconds,
+        httponly=True,
+        samesite="Lax",
+    )
+    # DRF кладет аутентифицированного пользователя и в HttpRequest
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        cache.set(_pin_key(user.pk), 1, seconds)
+
+
+def _iterate_with_alias(alias: str, content: Iterable[Any]) -> Iterator[Any]:
+    iterator = iter(content)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+
+        yield chunk
+
+
+async def _aiterate_with_alias(
+    alias: str,  # noqa: IND101
+    content: AsyncIterable[Any],  # noqa: IND101
+) -> AsyncIterator[Any]:
+    iterator = aiter(content)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+
+        yield chunk
+
+
+def keep_read_alias(response: HttpResponse, alias: str) -> HttpResponse:
+    """
+    Тело StreamingHttpResponse генерируется уже после выхода из middleware:
+    каждый его шаг выполняется с той же репликой, что и сам запрос
+    """
+
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = _aiterate_with_alias(
+                alias,
+                response.streaming_content,
+            )
+        else:
+            response.streaming_content = _iterate_with_alias(
+                alias,
+                response.streaming_content,
+            )
+
+    return response
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+
+        replicas = get_setting("REPLICAS")
+        if request.method not in SAFE_METHODS:
+            response = self.get_response(request)
+            if replicas and response.status_code < 400:
+                pin_to_primary(request, response)
+
+            return response
+
+        if (
+            not replicas
+            or not request.path.startswith(get_setting("API_PREFIX"))
+            or is_pinned(request)
+        ):
+            return self.get_response(request)
+
+        # Одна реплика на весь запрос: чтения видят один и тот же снимок
+        alias = random.choice(replicas)  # noqa: S311
+        token = _read_alias.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        return keep_read_alias(response, alias)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        replicas = get_setting("REPLICAS")
+        if request.method not in SAFE_METHODS:
+            response = await self.get_response(request)
+            if replicas and response.status_code < 400:
+                await sync_to_async(pin_to_primary)(request, response)
+
+            return response
+
+        if (
+            not replicas
+            or not request.path.startswith(get_setting("API_PREFIX"))
+            or await sync_to_async(is_pinned)(request)
+        ):
+            return await self.get_response(request)
+
+        # ContextVar доходит и до потоков, где async ORM выполняет запросы
+        alias = random.choice(replicas)  # noqa: S311
+        token = _read_alias.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        return keep_read_alias(response, alias)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model: type[models.Model], **hints: Any) -> Optional[str]:
+        return _read_alias.get()
+
+    def db_for_write(self, model: type[models.Model], **hints: Any) -> Optional[str]:
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(
+        self,  # noqa: IND101
+        obj1: models.Model,  # noqa: IND101
+        obj2: models.Model,  # noqa: IND101
+        **hints: Any,  # noqa: IND101
+    ) -> Optional[bool]:
+        # Реплики - копии default: объекты с любой из них связаны свободно
+        databases = {DEFAULT_DB_ALIAS, *get_setting("REPLICAS")}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+
+        return None
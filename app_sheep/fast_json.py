@@ -0,0 +1,73 @@
+"""
+Быстрые JSON-рендерер и парсер для DRF на orjson.
+
+Типы, которых нет в JSON (datetime, Decimal, ленивые строки, QuerySet...),
+передаются в encoder DRF, поэтому вывод совпадает со стандартным
+JSONRenderer. Если orjson не установлен или запрошен режим, который он не
+поддерживает (indent, ASCII или не-компактный вывод, не-UTF-8), используется stdlib.
+"""
+
+from typing import Any, Mapping, Optional
+
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson опционален
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(
+        self,  # noqa: IND101
+        data: Any,  # noqa: IND101
+        accepted_media_type: Optional[str] = None,  # noqa: IND101
+        renderer_context: Optional[Mapping[str, Any]] = None,  # noqa: IND101
+    ) -> bytes:
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context)
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        encoder = self.encoder_class()
+        content = orjson.dumps(
+            data,
+            default=encoder.default,
+            # Даты - через encoder DRF, чтобы формат совпадал со stdlib
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+        )
+        # Как JSONRenderer: U+2028/U+2029 экранируются для встраивания в JS
+        return content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+            b"\xe2\x80\xa9",
+            b"\\u2029",
+        )
+
+
+class FastJSONParser(JSONParser):
+    renderer_class = FastJSONRenderer
+
+    def parse(
+        self,  # noqa: IND101
+        stream: Any,  # noqa: IND101
+        media_type: Optional[str] = None,  # noqa: IND101
+        parser_context: Optional[Mapping[str, Any]] = None,  # noqa: IND101
+    ) -> Any:
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        if orjson is None or str(encoding).lower().replace("_", "-") != "utf-8":
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError("JSON parse error - %s" % str(exc))
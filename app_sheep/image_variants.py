@@ -0,0 +1,208 @@
+"""
+Уменьшенные WebP-варианты загруженных изображений (thumbnail, card, full).
+
+После коммита сохранения модели, у которой сменился файл, генерация уходит
+в локальный пул потоков или, если явно выбран WORKER="celery", в Celery.
+Имена готовых файлов пишутся в JSON-поле модели вместе с именем исходника
+("source"), по нему же сериализаторы понимают, что варианты актуальны; пока
+их нет, отдается URL оригинала.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from pathlib import PurePosixPath
+from typing import Any, Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, models, transaction
+from django.db.models.fields.files import FieldFile
+from django.dispatch import Signal
+from django.utils import timezone
+from PIL import Image, ImageOps
+from rest_framework.request import Request
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS: dict[str, Any] = {
+    "WORKER": "thread",  # celery | thread | sync
+    "THREADS": 2,
+    "QUALITY": 80,
+    # имя: (ширина, высота, обрезать до точного размера)
+    "SIZES": {
+        "thumbnail": (160, 160, True),
+        "card": (640, 360, True),
+        "full": (1600, 1600, False),
+    },
+}
+
+# sender - класс модели, kwargs: pk, field_name
+variants_ready = Signal()
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "IMAGE_VARIANTS", {}).get(name, DEFAULTS[name])
+
+
+def variant_url(
+    file: FieldFile,  # noqa: IND101
+    variants: dict[str, str],  # noqa: IND101
+    name: str,  # noqa: IND101
+    request: Optional[Request] = None,  # noqa: IND101
+) -> Optional[str]:
+    """URL варианта, пока он не готов - URL оригинала"""
+
+    if not file:
+        return None
+
+    path = variants.get(name) if variants.get("source") == file.name else None
+    url = file.storage.url(path) if path else file.url
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def variant_urls(
+    file: FieldFile,  # noqa: IND101
+    variants: dict[str, str],  # noqa: IND101
+    request: Optional[Request] = None,  # noqa: IND101
+) -> Optional[dict[str, Optional[str]]]:
+    if not file:
+        return None
+
+    return {
+        name: variant_url(file, variants, name, request)
+        for name in get_setting("SIZES")
+    }
+
+
+def schedule_variants(
+    instance: models.Model,  # noqa: IND101
+    field_name: str,  # noqa: IND101
+    variants_field: str,  # noqa: IND101
+) -> None:
+    """Ставит генерацию в очередь, если файл поменялся с прошлой генерации"""
+
+    source = getattr(instance, field_name).name or ""
+    if source == (getattr(instance, variants_field) or {}).get("source", ""):
+        return
+
+    transaction.on_commit(
+        partial(
+            _dispatch,
+            instance._meta.label,
+            instance.pk,
+            field_name,
+            variants_field,
+        ),
+    )
+
+
+def _dispatch(*args: Any) -> None:
+    worker = get_setting("WORKER")
+    if worker == "celery":
+        from .tasks import generate_image_variants
+
+        generate_image_variants.delay(*args)
+    elif worker == "thread":
+        _get_executor().submit(_generate_in_thread, *args)
+    else:
+        generate_variants(*args)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=get_setting("THREADS"),
+                    thread_name_prefix="image-variants",
+                )
+
+    return _executor
+
+
+def _generate_in_thread(*args: Any) -> None:
+    try:
+        generate_variants(*args)
+    except Exception:
+        logger.exception("Image variant generation failed for %s", args)
+    finally:
+        close_old_connections()
+
+
+def generate_variants(
+    model_label: str,  # noqa: IND101
+    pk: Any,  # noqa: IND101
+    field_name: str,  # noqa: IND101
+    variants_field: str,  # noqa: IND101
+) -> None:
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).only(field_name, variants_field).first()
+    if instance is None:
+        return
+
+    file = getattr(instance, field_name)
+    old_variants = getattr(instance, variants_field) or {}
+    new_variants = {"source": file.name, **render_variants(file)} if file else {}
+
+    changes: dict[str, Any] = {variants_field: new_variants}
+    if any(field.name == "updated_at" for field in model._meta.concrete_fields):
+        # updated_at входит в ETag/Last-Modified ответов с этими URL
+        changes["updated_at"] = timezone.now()
+
+    # Файл могли заменить, пока шла генерация - тогда результат устарел
+    updated = model.objects.filter(
+        pk=pk,
+        **{field_name: file.name or ""},
+    ).update(**changes)
+
+    if updated:
+        stale = _variant_files(old_variants) - _variant_files(new_variants)
+    else:
+        stale = _variant_files(new_variants)
+
+    for path in stale:
+        file.storage.delete(path)
+
+    if updated:
+        variants_ready.send(sender=model, pk=pk, field_name=field_name)
+
+
+def _variant_files(variants: dict[str, str]) -> set[str]:
+    return {path for name, path in variants.items() if name != "source"}
+
+
+def render_variants(file: FieldFile) -> dict[str, str]:
+    with file.open("rb"):
+        image = ImageOps.exif_transpose(Image.open(file))
+        image.load()
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "P") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    source = PurePosixPath(file.name)
+    names = {}
+    for name, (width, height, crop) in get_setting("SIZES").items():
+        if crop:
+            variant = ImageOps.fit(image, (width, height), Image.Resampling.LANCZOS)
+        else:
+            variant = image.copy()
+            variant.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+        buffer = BytesIO()
+        variant.save(buffer, "WEBP", quality=get_setting("QUALITY"))
+        names[name] = file.storage.save(
+            str(source.parent / "variants" / f"{source.stem}.{name}.webp"),
+            ContentFile(buffer.getvalue()),
+        )
+
+    return names
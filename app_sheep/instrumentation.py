@@ -0,0 +1,214 @@
+"""
+Инструментирование запросов: время и число SQL-запросов, время сериализации,
+время представления и всего запроса.
+
+Для доли запросов PERFORMANCE_INSTRUMENTATION["SAMPLE_RATE"] метрики
+пишутся JSON-строкой в лог app_sheep.instrumentation, а при включенном
+SERVER_TIMING еще и отдаются клиенту в заголовке Server-Timing (по умолчанию
+выключен). Остальные запросы не инструментируются вовсе.
+"""
+
+import json
+import logging
+import random
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS: dict[str, Any] = {
+    "SAMPLE_RATE": 0.0,
+    "SERVER_TIMING": False,
+}
+
+_current: ContextVar[Optional["RequestMetrics"]] = ContextVar(
+    "request_metrics",
+    default=None,
+)
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "PERFORMANCE_INSTRUMENTATION", {}).get(
+        name,
+        DEFAULTS[name],
+    )
+
+
+@dataclass
+class RequestMetrics:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    serializer_time: float = 0.0
+    view_started: Optional[float] = None
+    view_time: float = 0.0
+    serializing: bool = False
+
+    def timings(self, total: float) -> dict[str, float]:
+        """Длительности в миллисекундах"""
+
+        return {
+            "db": round(self.db_time * 1000, 3),
+            "serialize": round(self.serializer_time * 1000, 3),
+            "view": round(self.view_time * 1000, 3),
+            "total": round(total * 1000, 3),
+        }
+
+
+def current_metrics() -> Optional[RequestMetrics]:
+    return _current.get()
+
+
+def _query_timer(
+    execute: Callable,  # noqa: IND101
+    sql: str,  # noqa: IND101
+    params: Any,  # noqa: IND101
+    many: bool,  # noqa: IND101
+    context: dict[str, Any],  # noqa: IND101
+) -> Any:
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+def instrument_serializers() -> None:
+    """
+    Оборачивает BaseSerializer.data: учитывается только внешний сериализатор,
+    вложенные вызовы .data (например, ответы комментария) входят в его время.
+    """
+
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data
+    if getattr(original.fget, "instrumented", False):
+        return
+
+    def data(self: BaseSerializer) -> Any:
+        metrics = _current.get()
+        if metrics is None or metrics.serializing:
+            return original.fget(self)
+
+        metrics.serializing = True
+        started = time.perf_counter()
+        try:
+            return original.fget(self)
+        finally:
+            metrics.serializer_time += time.perf_counter() - started
+            metrics.serializing = False
+
+    data.instrumented = True  # type: ignore[attr-defined]
+    BaseSerializer.data = property(data)
+
+
+def install_query_timer(connection: BaseDatabaseWrapper, **kwargs: Any) -> None:
+    """
+    Обертка ставится на соединение один раз (по connection_created), а не на
+    время запроса: async ORM выполняет SQL в другом потоке со своим
+    соединением, и метрики запроса доходят туда только через ContextVar.
+    """
+
+    if _query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_query_timer)
+
+
+class PerformanceInstrumentationMiddleware:
+    """Ставится первым в MIDDLEWARE, чтобы total покрывал весь стек"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], Any]) -> None:
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if self.async_mode:
+            return self.__acall__(request)
+
+        sample_rate = get_setting("SAMPLE_RATE")
+        if sample_rate <= 0 or random.random() >= sample_rate:  # noqa: S311
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        return self.report(request, response, metrics)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        sample_rate = get_setting("SAMPLE_RATE")
+        if sample_rate <= 0 or random.random() >= sample_rate:  # noqa: S311
+            return await self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        return self.report(request, response, metrics)
+
+    def report(
+        self,  # noqa: IND101
+        request: HttpRequest,  # noqa: IND101
+        response: HttpResponse,  # noqa: IND101
+        metrics: RequestMetrics,  # noqa: IND101
+    ) -> HttpResponse:
+        if metrics.view_started is not None:
+            metrics.view_time = time.perf_counter() - metrics.view_started
+
+        timings = metrics.timings(time.perf_counter() - metrics.started)
+        if get_setting("SERVER_TIMING"):
+            response.headers["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={timings["db"]};desc="{metrics.queries} queries"',
+                    f"serialize;dur={timings['serialize']}",
+                    f"view;dur={timings['view']}",
+                    f"total;dur={timings['total']}",
+                ],
+            )
+
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "path": request.path,
+                    "status": response.status_code,
+                    "queries": metrics.queries,
+                    **{f"{name}_ms": value for name, value in timings.items()},
+                },
+            ),
+        )
+        return response
+
+    def process_view(
+        self,  # noqa: IND101
+        request: HttpRequest,  # noqa: IND101
+        view_func: Callable,  # noqa: IND101
+        view_args: Any,  # noqa: IND101
+        view_kwargs: Any,  # noqa: IND101
+    ) -> None:
+        # view - от вызова представления до ответа, включая рендеринг
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.view_started = time.perf_counter()
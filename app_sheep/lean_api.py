@@ -0,0 +1,130 @@
+"""
+Облегченный путь запросов к API.
+
+API аутентифицируется JWT, поэтому сессии, сообщения, CSRF и
+django-аутентификация ему не нужны: их middleware из этого модуля пропускают
+запросы с префиксами LEAN_API["PATH_PREFIXES"], админка получает полный стек.
+Чтения API не открывают транзакцию ATOMIC_REQUESTS (non_atomic_reads /
+NonAtomicReadsMixin), запись по-прежнему атомарна.
+"""
+
+from contextlib import ExitStack
+from functools import wraps
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.db import connections, transaction
+from django.http import HttpRequest
+from django.middleware.csrf import CsrfViewMiddleware
+from rest_framework.permissions import SAFE_METHODS
+
+DEFAULTS: dict[str, Any] = {
+    "PATH_PREFIXES": ["/api/"],
+    # True - чтения снова в транзакции (поведение ATOMIC_REQUESTS)
+    "ATOMIC_READS": False,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "LEAN_API", {}).get(name, DEFAULTS[name])
+
+
+def is_api_request(request: HttpRequest) -> bool:
+    return request.path.startswith(tuple(get_setting("PATH_PREFIXES")))
+
+
+class SkipForAPIMixin:
+    """Ставится перед MiddlewareMixin-классом Django"""
+
+    def __call__(self, request: HttpRequest) -> Any:
+        if is_api_request(request):
+            # В async-режиме get_response возвращает корутину - ее ждет вызывающий
+            return self.get_response(request)
+
+        return super().__call__(request)
+
+
+class LeanSessionMiddleware(SkipForAPIMixin, SessionMiddleware):
+    pass
+
+
+class LeanAuthenticationMiddleware(SkipForAPIMixin, AuthenticationMiddleware):
+    pass
+
+
+class LeanMessageMiddleware(SkipForAPIMixin, MessageMiddleware):
+    pass
+
+
+class LeanCsrfViewMiddleware(SkipForAPIMixin, CsrfViewMiddleware):
+    def process_view(
+        self,  # noqa: IND101
+        request: HttpRequest,  # noqa: IND101
+        callback: Callable,  # noqa: IND101
+        callback_args: Any,  # noqa: IND101
+        callback_kwargs: Any,  # noqa: IND101
+    ) -> Any:
+        # process_view вызывается обработчиком напрямую, мимо __call__
+        if is_api_request(request):
+            return None
+
+        return super().process_view(request, callback, callback_args, callback_kwargs)
+
+
+def non_atomic_reads(view: Callable) -> Callable:
+    """
+    Снимает с представления ATOMIC_REQUESTS и открывает транзакции сама,
+    только для небезопасных методов. Поверх @api_view или as_view().
+    """
+
+    if iscoroutinefunction(view):
+        # Async-представления (main.async_api) только читают
+        return _non_atomic(view)
+
+    @wraps(view)
+    def wrapped(request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+        if request.method in SAFE_METHODS and not get_setting("ATOMIC_READS"):
+            return _read(view, request, *args, **kwargs)
+
+        with ExitStack() as stack:
+            for alias, settings_dict in connections.settings.items():
+                if settings_dict["ATOMIC_REQUESTS"]:
+                    stack.enter_context(transaction.atomic(using=alias))
+
+            return view(request, *args, **kwargs)
+
+    return _non_atomic(wrapped)
+
+
+def _read(view: Callable, request: HttpRequest, *args: Any, **kwargs: Any) -> Any:
+    # Ответ ошибкой DRF помечает на откат текущую транзакцию. У чтения своей
+    # нет, а внешнюю (тесты, бенчмарки, вызывающий код) откатывать незачем
+    outer = {
+        alias: connections[alias].needs_rollback
+        for alias, settings_dict in connections.settings.items()
+        if settings_dict["ATOMIC_REQUESTS"] and connections[alias].in_atomic_block
+    }
+    response = view(request, *args, **kwargs)
+    for alias, needs_rollback in outer.items():
+        transaction.set_rollback(needs_rollback, using=alias)
+
+    return response
+
+
+def _non_atomic(view: Callable) -> Callable:
+    for alias in connections:
+        view = transaction.non_atomic_requests(using=alias)(view)
+
+    return view
+
+
+class NonAtomicReadsMixin:
+    """non_atomic_reads для class-based представлений"""
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable:
+        return non_atomic_reads(super().as_view(**initkwargs))
@@ -0,0 +1,52 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db.models import Q
+
+from accounts.models import User
+from app_sheep.image_variants import generate_variants, schedule_variants
+from main.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        "Создает недостающие варианты изображений постов и аватаров "
+        "(например, для файлов, загруженных до появления вариантов)"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--sync",
+            action="store_true",
+            help="Генерировать в этом процессе, а не ставить в очередь",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        targets = [
+            (Post, "image", "image_variants"),
+            (User, "avatar", "avatar_variants"),
+        ]
+        for model, field_name, variants_field in targets:
+            with_files = model.objects.exclude(
+                Q(**{field_name: ""}) | Q(**{field_name: None}),
+            ).only(field_name, variants_field)
+            total = 0
+            for instance in with_files.iterator():
+                source = getattr(instance, variants_field).get("source")
+                if source == getattr(instance, field_name).name:
+                    continue
+
+                if options["sync"]:
+                    generate_variants(
+                        model._meta.label,
+                        instance.pk,
+                        field_name,
+                        variants_field,
+                    )
+                else:
+                    schedule_variants(instance, field_name, variants_field)
+
+                total += 1
+
+            name = model._meta.verbose_name_plural
+            self.stdout.write(self.style.SUCCESS(f"Processed {total} {name}"))
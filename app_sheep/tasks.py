@@ -0,0 +1,15 @@
+from typing import Any
+
+from celery import shared_task
+
+from .image_variants import generate_variants
+
+
+@shared_task(ignore_result=True)
+def generate_image_variants(
+    model_label: str,  # noqa: IND101
+    pk: Any,  # noqa: IND101
+    field_name: str,  # noqa: IND101
+    variants_field: str,  # noqa: IND101
+) -> None:
+    generate_variants(model_label, pk, field_name, variants_field)
@@ -1,3 +1,167 @@
-from django.test import TestCase
+from typing import Any, Callable, Iterator
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import User
+from main.models import Post
+
+from .db_routing import (
+    PrimaryReplicaRouter,
+    ReplicaRoutingMiddleware,
+    read_from_primary,
+)
+
+ROUTING = {"REPLICAS": ["replica_1"], "PIN_SECONDS": 5}
+
+
+def read_alias() -> str:
+    """Алиас, с которого ORM прочитал бы посты прямо сейчас"""
+
+    return Post.objects.all().db
+
+
+@override_settings(DATABASE_ROUTING=ROUTING)
+class ReplicaRoutingMiddlewareTest(TestCase):
+    def setUp(self) -> None:
+        self.factory = RequestFactory()
+        self.seen: list[str] = []
+        cache.clear()
+
+    def view(self, status: int = 200) -> Callable[[HttpRequest], HttpResponse]:
+        def get_response(request: HttpRequest) -> HttpResponse:
+            self.seen.append(read_alias())
+            return HttpResponse(status=status)
+
+        return get_response
+
+    def call(self, request: HttpRequest, status: int = 200) -> HttpResponse:
+        return ReplicaRoutingMiddleware(self.view(status))(request)
+
+    def test_safe_api_read_goes_to_replica(self) -> None:
+        self.call(self.factory.get("/api/v1/posts/"))
+        self.assertEqual(self.seen, ["replica_1"])
+        self.assertEqual(read_alias(), "default")
+
+    def test_non_api_read_stays_on_primary(self) -> None:
+        self.call(self.factory.get("/admin/"))
+        self.assertEqual(self.seen, ["default"])
+
+    def test_read_from_primary_inside_request(self) -> None:
+        def get_response(request: HttpRequest) -> HttpResponse:
+            with read_from_primary():
+                self.seen.append(read_alias())
+
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(get_response)(self.factory.get("/api/v1/posts/"))
+        self.assertEqual(self.seen, ["default"])
+
+    def test_write_goes_to_primary_and_pins_client(self) -> None:
+        response = self.call(self.factory.post("/api/v1/posts/"), status=201)
+
+        self.assertEqual(self.seen, ["default"])
+        self.assertEqual(PrimaryReplicaRouter().db_for_write(Post), "default")
+        self.assertIn("db_primary_pin", response.cookies)
+
+        request = self.factory.get("/api/v1/posts/")
+        request.COOKIES["db_primary_pin"] = "1"
+        self.call(request)
+        self.assertEqual(self.seen[-1], "default")
+
+    def test_failed_write_does_not_pin(self) -> None:
+        response = self.call(self.factory.post("/api/v1/posts/"), status=400)
+        self.assertNotIn("db_primary_pin", response.cookies)
+
+    def test_writer_pinned_by_token(self) -> None:
+        writer, other = User(pk=1), User(pk=2)
+        request = self.factory.post("/api/v1/posts/")
+        request.user = writer
+        self.call(request, status=201)
+
+        for user, expected in ((writer, "default"), (other, "replica_1")):
+            token = AccessToken.for_user(user)
+            self.call(
+                self.factory.get(
+                    "/api/v1/posts/",
+                    headers={"authorization": f"Bearer {token}"},
+                ),
+            )
+            self.assertEqual(self.seen[-1], expected)
+
+    def test_streaming_body_reads_from_replica(self) -> None:
+        def rows() -> Iterator[str]:
+            yield read_alias()
+            yield read_alias()
+
+        response = ReplicaRoutingMiddleware(
+            lambda request: StreamingHttpResponse(rows()),
+        )(self.factory.get("/api/v1/posts/export/"))
+
+        # Тело генерируется уже после выхода из middleware
+        self.assertEqual(b"".join(response.streaming_content), b"replica_1replica_1")
+        self.assertEqual(read_alias(), "default")
+
+    def test_async_read_goes_to_replica(self) -> None:
+        async def get_response(request: HttpRequest) -> HttpResponse:
+            self.seen.append(read_alias())
+            return HttpResponse()
+
+        async_to_sync(ReplicaRoutingMiddleware(get_response))(
+            self.factory.get("/api/v1/posts/"),
+        )
+        self.assertEqual(self.seen, ["replica_1"])
+
+
+def has_separate_replica() -> bool:
+    replica: dict[str, Any] = settings.DATABASES.get("replica_1", {})
+    return bool(replica) and not replica.get("TEST", {}).get("MIRROR")
+
+
+@skipUnless(has_separate_replica(), "replica_1 is not a separate database")
+@override_settings(DATABASE_ROUTING=ROUTING)
+class ReplicaRoutingDatabaseTest(TestCase):
+    """
+    На двух отдельных БД (например, двух SQLite): реплика без новой строки
+    отстает от primary, и это видно по ответам API
+    """
+
+    # Пропущенный класс тоже учитывается раннером при создании тестовых БД
+    databases = {"default", "replica_1"} if has_separate_replica() else {"default"}
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        self.headers = {
+            "authorization": f"Bearer {AccessToken.for_user(self.author)}",
+        }
+
+    def titles(self, **headers: Any) -> list[str]:
+        response = self.client.get("/api/v1/posts/", headers=headers)
+        return [post["title"] for post in response.json()["results"]]
+
+    def test_reads_replica_until_writer_is_pinned(self) -> None:
+        Post.objects.create(title="Primary only", content="Content", author=self.author)
+        self.assertEqual(self.titles(), [])
+
+        response = self.client.post(
+            "/api/v1/posts/",
+            {"title": "Written", "content": "Content"},
+            headers=self.headers,
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Post.objects.using("replica_1").count(), 0)
+
+        self.client.cookies.clear()
+        self.assertEqual(self.titles(**self.headers), ["Written", "Primary only"])
+        self.assertEqual(self.titles(), [])
@@ -0,0 +1,423 @@
+"""
+Двухуровневый кеш: ограниченный LRU в памяти процесса перед общим бэкендом
+(Redis в production, locmem/файлы в разработке и тестах).
+
+Бэкенд подключается отдельным алиасом (CACHES["hot"]) и нужен для мелких
+горячих чтений: попадание в локальный уровень не ходит в сеть. Обычные
+ключи живут в памяти процесса не дольше LOCAL_TIMEOUT секунд - настолько
+другие процессы могут отставать от set()/delete(). Для данных, которые
+должны сбрасываться во всех процессах сразу, есть версионированные ключи:
+значение под версией пространства имен не меняется, поэтому хранится
+локально весь свой срок, а сброс - это инкремент версии в общем уровне,
+которую процессы перечитывают раз в VERSION_CHECK_INTERVAL секунд.
+
+Локальный уровень отдает сам закешированный объект, а не копию, поэтому
+изменять полученные значения нельзя. Счетчики попаданий/промахов ведутся по
+уровням и по процессу (stats()).
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.connection import ConnectionProxy
+
+HOT_CACHE_ALIAS = "hot"
+
+_MISSING = object()
+
+
+class _LocalTier:
+    """LRU с TTL; один на LOCATION, общий для потоков процесса"""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.entries: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        # пространство имен -> (когда перечитать из общего уровня, версия)
+        self.versions: dict[str, tuple[float, int]] = {}
+        self.stats = {"local": Counter(), "shared": Counter()}
+
+
+# Django создает экземпляр бэкенда на каждый поток, как и у LocMemCache
+# общее хранилище процесса живет на уровне модуля
+_local_tiers: dict[str, _LocalTier] = {}
+_local_tiers_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """
+    OPTIONS: SHARED - алиас общего кеша, MAX_ENTRIES - размер LRU,
+    LOCAL_TIMEOUT и VERSION_CHECK_INTERVAL - в секундах.
+    """
+
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED", "default")
+        self._local_timeout = options.get("LOCAL_TIMEOUT", 5)
+        self._version_interval = options.get("VERSION_CHECK_INTERVAL", 1)
+        with _local_tiers_lock:
+            self._tier = _local_tiers.setdefault(location, _LocalTier())
+
+    @property
+    def shared(self) -> BaseCache:
+        return caches[self._shared_alias]
+
+    # Локальный уровень
+
+    def _local_get(self, key: str) -> Any:
+        tier = self._tier
+        with tier.lock:
+            entry = tier.entries.get(key)
+            if entry is not None and (entry[0] is None or entry[0] > time.time()):
+                tier.entries.move_to_end(key)
+                tier.stats["local"]["hits"] += 1
+                return entry[1]
+
+            if entry is not None:
+                del tier.entries[key]
+
+            tier.stats["local"]["misses"] += 1
+            return _MISSING
+
+    def _local_set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        tier = self._tier
+        with tier.lock:
+            tier.entries[key] = (expires_at, value)
+            tier.entries.move_to_end(key)
+            while len(tier.entries) > self._max_entries:
+                tier.entries.popitem(last=False)
+
+    def _local_delete(self, key: str) -> None:
+        with self._tier.lock:
+            self._tier.entries.pop(key, None)
+
+    def _local_expiry(self, timeout: Any = DEFAULT_TIMEOUT) -> Optional[float]:
+        expires_at = self.get_backend_timeout(timeout)
+        if self._local_timeout is None:
+            return expires_at
+
+        local_expires_at = time.time() + self._local_timeout
+        if expires_at is None:
+            return local_expires_at
+
+        return min(expires_at, local_expires_at)
+
+    def _count_shared(self, value: Any) -> None:
+        with self._tier.lock:
+            self._tier.stats["shared"]["misses" if value is _MISSING else "hits"] += 1
+
+    # API BaseCache
+
+    def add(
+        self,  # noqa: IND101
+        key: str,  # noqa: IND101
+        value: Any,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> bool:
+        added = self.shared.add(key, value, timeout, version)
+        if added:
+            self._local_set(
+                self.make_and_validate_key(key, version),
+                value,
+                self._local_expiry(timeout),
+            )
+
+        return added
+
+    def get(self, key: str, default: Any = None, version: Optional[int] = None) -> Any:
+        local_key = self.make_and_validate_key(key, version)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = self.shared.get(key, _MISSING, version)
+            self._count_shared(value)
+            if value is _MISSING:
+                return default
+
+            self._local_set(local_key, value, self._local_expiry())
+
+        return value
+
+    async def aget(
+        self,  # noqa: IND101
+        key: str,  # noqa: IND101
+        default: Any = None,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> Any:
+        # Попадание в локальный уровень не уходит в поток sync_to_async
+        local_key = self.make_and_validate_key(key, version)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = await self.shared.aget(key, _MISSING, version)
+            self._count_shared(value)
+            if value is _MISSING:
+                return default
+
+            self._local_set(local_key, value, self._local_expiry())
+
+        return value
+
+    def set(
+        self,  # noqa: IND101
+        key: str,  # noqa: IND101
+        value: Any,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> None:
+        self.shared.set(key, value, timeout, version)
+        self._local_set(
+            self.make_and_validate_key(key, version),
+            value,
+            self._local_expiry(timeout),
+        )
+
+    async def aset(
+        self,  # noqa: IND101
+        key: str,  # noqa: IND101
+        value: Any,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> None:
+        await self.shared.aset(key, value, timeout, version)
+        self._local_set(
+            self.make_and_validate_key(key, version),
+            value,
+            self._local_expiry(timeout),
+        )
+
+    def get_many(self, keys: Iterable[str], version: Optional[int] = None) -> dict:
+        # Промахи локального уровня - одним запросом к общему
+        found, missing = {}, {}
+        for key in keys:
+            local_key = self.make_and_validate_key(key, version)
+            value = self._local_get(local_key)
+            if value is _MISSING:
+                missing[key] = local_key
+            else:
+                found[key] = value
+
+        if missing:
+            shared = self.shared.get_many(missing, version)
+            with self._tier.lock:
+                self._tier.stats["shared"]["hits"] += len(shared)
+                self._tier.stats["shared"]["misses"] += len(missing) - len(shared)
+
+            for key, value in shared.items():
+                self._local_set(missing[key], value, self._local_expiry())
+
+            found.update(shared)
+
+        return found
+
+    def set_many(
+        self,  # noqa: IND101
+        data: dict[str, Any],  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> list:
+        failed = self.shared.set_many(data, timeout, version)
+        for key, value in data.items():
+            if key not in failed:
+                self._local_set(
+                    self.make_and_validate_key(key, version),
+                    value,
+                    self._local_expiry(timeout),
+                )
+
+        return failed
+
+    def delete_many(self, keys: Iterable[str], version: Optional[int] = None) -> None:
+        keys = list(keys)
+        for key in keys:
+            self._local_delete(self.make_and_validate_key(key, version))
+
+        self.shared.delete_many(keys, version)
+
+    def touch(
+        self,  # noqa: IND101
+        key: str,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+        version: Optional[int] = None,  # noqa: IND101
+    ) -> bool:
+        self._local_delete(self.make_and_validate_key(key, version))
+        return self.shared.touch(key, timeout, version)
+
+    def delete(self, key: str, version: Optional[int] = None) -> bool:
+        self._local_delete(self.make_and_validate_key(key, version))
+        return self.shared.delete(key, version)
+
+    def incr(self, key: str, delta: int = 1, version: Optional[int] = None) -> int:
+        # Счетчики не кешируются локально: значение есть только в общем уровне
+        self._local_delete(self.make_and_validate_key(key, version))
+        return self.shared.incr(key, delta, version)
+
+    def clear(self) -> None:
+        with self._tier.lock:
+            self._tier.entries.clear()
+            self._tier.versions.clear()
+
+        self.shared.clear()
+
+    # Версионированные ключи
+
+    def _version_key(self, namespace: str) -> str:
+        return f"tiered:version:{namespace}"
+
+    def _cached_version(self, namespace: str) -> Optional[int]:
+        with self._tier.lock:
+            check_at, version = self._tier.versions.get(namespace, (0.0, None))
+            return version if check_at > time.monotonic() else None
+
+    def _remember_version(self, namespace: str, version: int) -> int:
+        with self._tier.lock:
+            self._tier.versions[namespace] = (
+                time.monotonic() + self._version_interval,
+                version,
+            )
+
+        return version
+
+    def get_namespace_version(self, namespace: str) -> int:
+        version = self._cached_version(namespace)
+        if version is not None:
+            return version
+
+        key = self._version_key(namespace)
+        version = self.shared.get(key)
+        if version is None:
+            # Начальная версия от времени: не совпадет с версией вытесненного ключа
+            self.shared.add(key, time.time_ns(), None)
+            version = self.shared.get(key)
+
+        return self._remember_version(namespace, version)
+
+    async def aget_namespace_version(self, namespace: str) -> int:
+        version = self._cached_version(namespace)
+        if version is not None:
+            return version
+
+        key = self._version_key(namespace)
+        version = await self.shared.aget(key)
+        if version is None:
+            await self.shared.aadd(key, time.time_ns(), None)
+            version = await self.shared.aget(key)
+
+        return self._remember_version(namespace, version)
+
+    def invalidate_namespace(self, namespace: str) -> None:
+        """Сбрасывает все ключи пространства имен во всех процессах"""
+
+        key = self._version_key(namespace)
+        try:
+            version = self.shared.incr(key)
+        except ValueError:
+            version = time.time_ns()
+            self.shared.set(key, version, None)
+
+        # Этот процесс видит сброс сразу, остальные - при следующей сверке
+        self._remember_version(namespace, version)
+
+    def get_versioned(self, namespace: str, key: str, default: Any = None) -> Any:
+        versioned_key = f"{namespace}:{self.get_namespace_version(namespace)}:{key}"
+        local_key = self.make_and_validate_key(versioned_key)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = self.shared.get(versioned_key, _MISSING)
+            self._count_shared(value)
+            if value is _MISSING:
+                return default
+
+            # Значение под версией неизменно - LOCAL_TIMEOUT не нужен
+            self._local_set(local_key, value, self.get_backend_timeout())
+
+        return value
+
+    async def aget_versioned(
+        self,  # noqa: IND101
+        namespace: str,  # noqa: IND101
+        key: str,  # noqa: IND101
+        default: Any = None,  # noqa: IND101
+    ) -> Any:
+        versioned_key = (
+            f"{namespace}:{await self.aget_namespace_version(namespace)}:{key}"
+        )
+        local_key = self.make_and_validate_key(versioned_key)
+        value = self._local_get(local_key)
+        if value is _MISSING:
+            value = await self.shared.aget(versioned_key, _MISSING)
+            self._count_shared(value)
+            if value is _MISSING:
+                return default
+
+            self._local_set(local_key, value, self.get_backend_timeout())
+
+        return value
+
+    def set_versioned(
+        self,  # noqa: IND101
+        namespace: str,  # noqa: IND101
+        key: str,  # noqa: IND101
+        value: Any,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+    ) -> None:
+        versioned_key = f"{namespace}:{self.get_namespace_version(namespace)}:{key}"
+        self.shared.set(versioned_key, value, timeout)
+        self._local_set(
+            self.make_and_validate_key(versioned_key),
+            value,
+            self.get_backend_timeout(timeout),
+        )
+
+    async def aset_versioned(
+        self,  # noqa: IND101
+        namespace: str,  # noqa: IND101
+        key: str,  # noqa: IND101
+        value: Any,  # noqa: IND101
+        timeout: Any = DEFAULT_TIMEOUT,  # noqa: IND101
+    ) -> None:
+        versioned_key = (
+            f"{namespace}:{await self.aget_namespace_version(namespace)}:{key}"
+        )
+        await self.shared.aset(versioned_key, value, timeout)
+        self._local_set(
+            self.make_and_validate_key(versioned_key),
+            value,
+            self.get_backend_timeout(timeout),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        tier = self._tier
+        with tier.lock:
+            return {
+                "local": {
+                    "hits": 0,
+                    "misses": 0,
+                    **tier.stats["local"],
+                    "entries": len(tier.entries),
+                    "max_entries": self._max_entries,
+                },
+                "shared": {
+                    "hits": 0,
+                    "misses": 0,
+                    **tier.stats["shared"],
+                    "alias": self._shared_alias,
+                },
+            }
+
+
+hot_cache = ConnectionProxy(caches, HOT_CACHE_ALIAS)
+
+
+def cache_stats() -> dict[str, Any]:
+    """Счетчики всех двухуровневых кешей этого процесса по алиасам"""
+
+    return {
+        alias: caches[alias].stats()
+        for alias in settings.CACHES
+        if isinstance(caches[alias], TieredCache)
+    }
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from app_sheep import views
+
+urlpatterns = [
+    path("db-pool/", views.DatabasePoolStatsView.as_view(), name="db-pool-stats"),
+    path("cache/", views.CacheStatsView.as_view(), name="cache-stats"),
+]
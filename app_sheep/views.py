@@ -1,3 +1,28 @@
-from django.shortcuts import render
+from typing import Any
 
-# Create your views here.
+from rest_framework import permissions
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .db_pool import pool_stats
+from .lean_api import NonAtomicReadsMixin
+from .tiered_cache import cache_stats
+
+
+class DatabasePoolStatsView(NonAtomicReadsMixin, APIView):
+    """Соединения с БД этого процесса: пул, открытые, время соединения"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return Response(pool_stats())
+
+
+class CacheStatsView(NonAtomicReadsMixin, APIView):
+    """Попадания и промахи двухуровневых кешей этого процесса по уровням"""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return Response(cache_stats())
@@ -53,15 +53,15 @@ class CommentAdmin(admin.ModelAdmin):
     def get_queryset(self, request: HttpRequest) -> QuerySet[Comment]:  # noqa: CCE001
         return super().get_queryset(request).select_related("author", "post", "parent")
 
-    action = ["make_active", "make_inactive"]
+    actions = ["make_active", "make_inactive"]
 
     def make_active(  # noqa: CCE001
         self,
         request: HttpRequest,
         queryset: QuerySet[Any],
     ) -> None:
-        updated = queryset.update(is_active=True)
-        self.massage_user(request, f"{updated} comments were marked as active.")
+        updated = queryset.set_active(True)
+        self.message_user(request, f"{updated} comments were marked as active.")
 
     make_active.short_description = "Mark selected comments as active"  # type: ignore[attr-defined]
 
@@ -70,7 +70,7 @@ class CommentAdmin(admin.ModelAdmin):
         request: HttpRequest,
         queryset: QuerySet[Any],
     ) -> None:
-        updated = queryset.updated(is_active=False)
+        updated = queryset.set_active(False)
         self.message_user(request, f"{updated} comments were marked as inactive.")
 
     make_inactive.short_description = "mark selected comments as inactive"  # type: ignore[attr-defined]
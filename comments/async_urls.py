@@ -0,0 +1,15 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path(
+        "post/<int:post_id>/",
+        async_views.AsyncPostCommentsView.as_view(),
+        name="async-post-comments",
+    ),
+    path(
+        "<int:comment_id>/replies/",
+        async_views.AsyncCommentRepliesView.as_view(),
+        name="async-comment-replies",
+    ),
+]
@@ -0,0 +1,76 @@
+"""Async-варианты read-эндпоинтов комментариев (под /api/v1/async/)"""
+
+from typing import Any
+
+from rest_framework import permissions, serializers, views
+from rest_framework.request import Request
+from rest_framework.response import Response
+from django.shortcuts import aget_object_or_404
+
+from main.async_api import AsyncAPIViewMixin
+from main.models import Post
+from .models import Comment
+from .serializers import CommentDetailSerializer, CommentSerializer
+from .tree import aload_post_comment_tree
+from .tree_cache import acached_post_comments
+
+
+class AsyncPostCommentsView(AsyncAPIViewMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request: Request, post_id: int) -> Response:
+        depth = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+        max_depth = depth.run_validation(request.query_params.get("depth"))
+
+        async def build() -> dict[str, Any]:
+            post = await aget_object_or_404(Post, id=post_id, status="published")
+            comments = await aload_post_comment_tree(post.id, max_depth=max_depth)
+            serializer = CommentDetailSerializer(
+                comments,
+                many=True,
+                context={"request": request},
+            )
+            return {
+                "post": {"id": post.id, "title": post.title, "slug": post.slug},
+                "comments": serializer.data,
+                "comment_count": post.comments_count,
+            }
+
+        return Response(
+            await acached_post_comments(post_id, max_depth, request, build),
+        )
+
+
+class AsyncCommentRepliesView(AsyncAPIViewMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request: Request, comment_id: int) -> Response:
+        parent_comment = await aget_object_or_404(
+            Comment.objects.select_related("author"),
+            id=comment_id,
+            is_active=True,
+        )
+
+        replies = [
+            reply
+            async for reply in Comment.objects.filter(
+                parent=parent_comment,
+                is_active=True,
+            )
+            .select_related("author")
+            .with_replies_count()
+            .order_by("created_at")
+        ]
+        parent_comment.active_replies_count = len(replies)
+
+        serializer = CommentSerializer(replies, many=True, context={"request": request})
+        return Response(
+            {
+                "parent_comment": CommentSerializer(
+                    parent_comment,
+                    context={"request": request},
+                ).data,
+                "replies": serializer.data,
+                "replies_count": len(replies),
+            },
+        )
@@ -1,8 +1,46 @@
-from django.db import models
+from collections import Counter
+from typing import Any, Optional
+
+from django.db import models, transaction
+from django.db.models import Count, Q
 
 from config import settings
 
 
+class CommentQuerySet(models.QuerySet):
+    def with_replies_count(self) -> "CommentQuerySet":
+        return self.annotate(
+            active_replies_count=Count("replies", filter=Q(replies__is_active=True)),
+        )
+
+    def set_active(self, is_active: bool) -> int:
+        """Массово меняет is_active и синхронизирует счетчики постов и авторов"""
+
+        post_model = self.model._meta.get_field("post").related_model
+        author_model = self.model._meta.get_field("author").related_model
+        with transaction.atomic():
+            changed = list(
+                self.exclude(is_active=is_active)
+                .select_for_update()
+                .values_list("pk", "post_id", "author_id"),
+            )
+            updated = self.model.objects.filter(
+                pk__in=[pk for pk, _, _ in changed],
+            ).update(is_active=is_active)
+            sign = 1 if is_active else -1
+            per_post = Counter(post_id for _, post_id, _ in changed)
+            per_author = Counter(author_id for _, _, author_id in changed)
+            post_model.adjust_comments_count(
+                {post_id: sign * count for post_id, count in per_post.items()},
+            )
+            author_model.adjust_counter(
+                "comments_count",
+                {author_id: sign * count for author_id, count in per_author.items()},
+            )
+
+        return updated
+
+
 class Comment(models.Model):
     class Meta:
         db_table = "comments"
@@ -37,13 +75,46 @@ class Comment(models.Model):
         related_name="replies",
     )
 
+    objects = CommentQuerySet.as_manager()
+
+    # (post_id, is_active) на момент загрузки из БД, None для новых объектов
+    _counted_state: Optional[tuple[int, bool]] = None
+
     def __str__(self) -> str:
         return f"Comment by {self.author.username} on {self.post.title}"
 
+    @classmethod
+    def from_db(cls, db: Any, field_names: Any, values: Any) -> "Comment":
+        instance = super().from_db(db, field_names, values)
+        if "post_id" in instance.__dict__ and "is_active" in instance.__dict__:
+            instance._counted_state = (instance.post_id, instance.is_active)
+
+        return instance
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # post_save отправляется после транзакции save_base,
+        # поэтому счетчик обновляем в общей транзакции здесь
+        with transaction.atomic():
+            if self._counted_state is None and self.pk is not None:
+                # Загружен через only()/defer() или собран вручную с pk
+                self._counted_state = (
+                    Comment.objects.filter(pk=self.pk)
+                    .values_list("post_id", "is_active")
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+        self._counted_state = (self.post_id, self.is_active)
+
     @property
-    def replies_count(self) -> str:
-        return self.replies.filter(is_active=True).cont()
+    def replies_count(self) -> int:
+        # Заполняется with_replies_count() или build_comment_tree()
+        if hasattr(self, "active_replies_count"):
+            return self.active_replies_count
+
+        return self.replies.filter(is_active=True).count()
 
     @property
     def is_reply(self) -> bool:
-        return self.parent is not None
+        return self.parent_id is not None
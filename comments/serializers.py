@@ -1,11 +1,13 @@
-from typing import Any, List
+from typing import Any, Iterable, Iterator, List
 from rest_framework import serializers
 
+from main.fieldsets import SparseFieldsetSerializerMixin
 from main.models import Post
+from main.summaries import SummaryField, SummaryListSerializer
 from .models import Comment
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Comment
@@ -22,19 +24,24 @@ class CommentSerializer(serializers.ModelSerializer):
             "updated_at",
         ]
         read_only_fields = ["author", "is_active"]
+        sparse_columns = {
+            "author_info": (
+                "author__id",
+                "author__username",
+                "author__first_name",
+                "author__last_name",
+                "author__avatar",
+                "author__avatar_variants",
+            ),
+            "replies_count": (),  # active_replies_count из with_replies_count()
+            "is_reply": ("parent",),
+        }
+        list_serializer_class = SummaryListSerializer
 
-    author_info = serializers.SerializerMethodField()
+    author_info = SummaryField("author")
     replies_count = serializers.ReadOnlyField()
     is_reply = serializers.ReadOnlyField()
 
-    def get_author_info(self, obj: Any) -> dict[str, Any]:
-        return {
-            "id": obj.author.id,
-            "username": obj.author.username,
-            "full_name": obj.author.full_name,
-            "avatar": obj.author.avatar.url if obj.author.avatar else None,
-        }
-
 
 class CommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
@@ -63,6 +70,15 @@ class CommentCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class CommentBulkItemSerializer(serializers.Serializer):
+    """Элемент пакетной записи: post/parent - голые id, проверяются пакетно во view"""
+
+    id = serializers.IntegerField(required=False)
+    post = serializers.IntegerField()
+    parent = serializers.IntegerField(required=False, allow_null=True)
+    content = serializers.CharField()
+
+
 class CommentUpdateSerializer(serializers.ModelSerializer):
 
     class Meta:
@@ -76,9 +92,30 @@ class CommentDetailSerializer(CommentSerializer):
 
     replies = serializers.SerializerMethodField()
 
+    def get_summary_instances(self, instances: Iterable[Any]) -> Iterator[Any]:
+        # Авторы всего собранного дерева загружаются вместе с корнями
+        stack = list(instances)
+        while stack:
+            comment = stack.pop()
+            yield comment
+            stack.extend(getattr(comment, "tree_replies", ()))
+
     def get_replies(self, obj: Any) -> List[dict]:
-        if obj.parent is None:
-            replies = obj.replies.filter(is_active=True).order_by("create_at")
+        # Дерево уже собрано в памяти (comments.tree), запросов не нужно
+        if hasattr(obj, "tree_replies"):
+            return CommentDetailSerializer(
+                obj.tree_replies,
+                many=True,
+                context=self.context,
+            ).data
+
+        if obj.parent_id is None:
+            replies = (
+                obj.replies.filter(is_active=True)
+                .select_related("author")
+                .with_replies_count()
+                .order_by("created_at")
+            )
             return CommentSerializer(replies, many=True, context=self.context).data
 
         return []
@@ -0,0 +1,79 @@
+from collections import Counter
+from typing import Any
+
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from main.models import Post
+from .models import Comment
+from .tree_cache import invalidate_post_comments
+
+
+@receiver(post_save, sender=Comment)
+def sync_comments_count_on_save(
+    sender: type[Comment],  # noqa: IND101
+    instance: Comment,  # noqa: IND101
+    created: bool,  # noqa: IND101
+    **kwargs: Any,  # noqa: IND101
+) -> None:
+    post_deltas: Counter[int] = Counter()
+    author_delta = 0
+    old_state = None if created else instance._counted_state
+    if old_state is not None and old_state[1]:
+        post_deltas[old_state[0]] -= 1
+        author_delta -= 1
+
+    if instance.is_active:
+        post_deltas[instance.post_id] += 1
+        author_delta += 1
+
+    Post.adjust_comments_count(post_deltas)
+    User.adjust_counter("comments_count", {instance.author_id: author_delta})
+    invalidate_post_comments([instance.post_id])
+
+
+@receiver(pre_delete, sender=Comment)
+def load_comment_state_on_delete(
+    sender: type[Comment],  # noqa: IND101
+    instance: Comment,  # noqa: IND101
+    **kwargs: Any,  # noqa: IND101
+) -> None:
+    # После удаления строки отложенные (only()/defer()) поля уже не догрузить
+    deferred = instance.get_deferred_fields() & {"post_id", "is_active", "author_id"}
+    if deferred:
+        instance.refresh_from_db(using=instance._state.db, fields=deferred)
+
+    if instance._counted_state is None:
+        instance._counted_state = (instance.post_id, instance.is_active)
+
+
+@receiver(post_delete, sender=Comment)
+def sync_comments_count_on_delete(
+    sender: type[Comment],  # noqa: IND101
+    instance: Comment,  # noqa: IND101
+    origin: Any = None,  # noqa: IND101
+    **kwargs: Any,  # noqa: IND101
+) -> None:
+    # Срабатывает и для каскадно удаленных ответов, внутри транзакции Collector
+    post_id, is_active = instance._counted_state
+    if not is_active:
+        return
+
+    invalidate_post_comments([post_id])
+
+    # Пост или автор удаляются вместе с комментарием - их счетчик не нужен
+    post_deleted = isinstance(origin, Post) and origin.pk == post_id
+    if not post_deleted and not (isinstance(origin, QuerySet) and origin.model is Post):
+        Post.adjust_comments_count({post_id: -1})
+
+    if not (isinstance(origin, User) and origin.pk == instance.author_id):
+        User.adjust_counter("comments_count", {instance.author_id: -1})
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def post_changed(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # Заголовок, slug и статус поста входят в кешированный ответ post_comments
+    invalidate_post_comments([instance.pk])
@@ -1,3 +1,109 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import User
+from main.models import Post
+
+from .models import Comment
+
+
+class CommentCountersTest(TestCase):
+    def setUp(self) -> None:
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        self.post = Post.objects.create(
+            title="Post",
+            content="Content",
+            author=self.author,
+        )
+
+    def create_comment(self, **kwargs: object) -> Comment:
+        return Comment.objects.create(
+            post=kwargs.pop("post", self.post),
+            author=self.author,
+            content="Comment",
+            **kwargs,
+        )
+
+    def assertCounters(self, post_comments: int, author_comments: int) -> None:
+        self.post.refresh_from_db()
+        self.author.refresh_from_db()
+        self.assertEqual(
+            (self.post.comments_count, self.author.comments_count),
+            (post_comments, author_comments),
+        )
+
+    def test_create(self) -> None:
+        self.create_comment()
+        self.create_comment(is_active=False)
+        self.assertCounters(1, 1)
+
+    def test_toggle_active(self) -> None:
+        comment = self.create_comment()
+        comment.is_active = False
+        comment.save()
+        self.assertCounters(0, 0)
+
+        comment.is_active = True
+        comment.save()
+        self.assertCounters(1, 1)
+
+    def test_move_to_other_post(self) -> None:
+        other = Post.objects.create(
+            title="Other", content="Content", author=self.author
+        )
+        comment = self.create_comment()
+        comment.post = other
+        comment.save()
+
+        self.assertCounters(0, 1)
+        other.refresh_from_db()
+        self.assertEqual(other.comments_count, 1)
+
+    def test_set_active(self) -> None:
+        self.create_comment()
+        self.create_comment()
+        self.create_comment(is_active=False)
+
+        self.assertEqual(Comment.objects.all().set_active(False), 2)
+        self.assertCounters(0, 0)
+        self.assertEqual(Comment.objects.all().set_active(True), 3)
+        self.assertCounters(3, 3)
+
+    def test_cascade_from_parent(self) -> None:
+        parent = self.create_comment()
+        reply = self.create_comment(parent=parent)
+        self.create_comment(parent=reply)
+        self.create_comment(parent=reply, is_active=False)
+        self.create_comment()
+        self.assertCounters(4, 4)
+
+        parent.delete()
+        self.assertCounters(1, 1)
+
+    def test_post_delete_keeps_author_counter_consistent(self) -> None:
+        other = Post.objects.create(
+            title="Other", content="Content", author=self.author
+        )
+        self.create_comment(post=other)
+        self.create_comment()
+        other.delete()
+        self.assertCounters(1, 1)
+
+    def test_save_partially_loaded(self) -> None:
+        comment = self.create_comment()
+        partial = Comment.objects.only("content").get(pk=comment.pk)
+        partial.is_active = False
+        partial.save()
+        self.assertCounters(0, 0)
+
+    def test_delete_partially_loaded(self) -> None:
+        comment = self.create_comment()
+        self.create_comment()
+        Comment.objects.only("content").get(pk=comment.pk).delete()
+        self.assertCounters(1, 1)
+
+        Comment.objects.defer("is_active", "post", "author").delete()
+        self.assertCounters(0, 0)
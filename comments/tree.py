@@ -0,0 +1,68 @@
+"""
+Сборка дерева комментариев в памяти.
+
+Вся активная ветка поста читается одним запросом, дерево и счетчики
+ответов строятся за один проход без запросов на каждый комментарий.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from .models import Comment
+
+
+def build_comment_tree(
+    comments: Iterable[Comment],  # noqa: IND101
+    root_id: Optional[int] = None,  # noqa: IND101
+    max_depth: Optional[int] = None,  # noqa: IND101
+) -> list[Comment]:
+    """
+    Раскладывает комментарии по родителям и возвращает корни ветки
+    (ответы на root_id, либо комментарии верхнего уровня).
+
+    Каждому узлу проставляются tree_replies (ответы по created_at, пусто
+    глубже max_depth) и active_replies_count (число всех прямых ответов).
+    Ответы на комментарии, отсутствующие в выборке, в дерево не попадают.
+    """
+
+    children: defaultdict[Optional[int], list[Comment]] = defaultdict(list)
+    for comment in comments:
+        children[comment.parent_id].append(comment)
+
+    roots = sorted(children.get(root_id, []), key=lambda c: c.created_at, reverse=True)
+    stack = [(comment, 1) for comment in roots]
+    while stack:
+        comment, depth = stack.pop()
+        replies = sorted(children.get(comment.pk, []), key=lambda c: c.created_at)
+        comment.active_replies_count = len(replies)
+        if max_depth is not None and depth >= max_depth:
+            comment.tree_replies = []
+            continue
+
+        comment.tree_replies = replies
+        stack.extend((reply, depth + 1) for reply in replies)
+
+    return roots
+
+
+def load_post_comment_tree(
+    post_id: int,  # noqa: IND101
+    max_depth: Optional[int] = None,  # noqa: IND101
+) -> list[Comment]:
+    comments = Comment.objects.filter(post_id=post_id, is_active=True).select_related(
+        "author",
+    )
+    return build_comment_tree(comments, max_depth=max_depth)
+
+
+async def aload_post_comment_tree(
+    post_id: int,  # noqa: IND101
+    max_depth: Optional[int] = None,  # noqa: IND101
+) -> list[Comment]:
+    comments = Comment.objects.filter(post_id=post_id, is_active=True).select_related(
+        "author",
+    )
+    return build_comment_tree(
+        [comment async for comment in comments],
+        max_depth=max_depth,
+    )
@@ -0,0 +1,87 @@
+"""
+Кеш ответа post_comments (пост, дерево комментариев, счетчик).
+
+Данные поста лежат под версионированным ключом двухуровневого кеша
+(app_sheep.tiered_cache) по глубине и хосту, поэтому горячее обсуждение
+отдается из памяти процесса. Версия поста сбрасывается после коммита при
+любом изменении его комментариев и самого поста; смена имени или аватара
+автора видна по истечении COMMENT_TREE_TIMEOUT.
+"""
+
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from django.db import transaction
+from rest_framework.request import Request
+
+from app_sheep.db_routing import read_from_primary
+from app_sheep.tiered_cache import hot_cache
+
+COMMENT_TREE_TIMEOUT = 60
+
+
+def _namespace(post_id: int) -> str:
+    return f"comments:post:{post_id}"
+
+
+def _key(request: Request, max_depth: Optional[int]) -> str:
+    # Хост в ключе: ссылки на аватары абсолютные
+    return f"{max_depth}:{request.get_host()}"
+
+
+def cached_post_comments(
+    post_id: int,  # noqa: IND101
+    max_depth: Optional[int],  # noqa: IND101
+    request: Request,  # noqa: IND101
+    build: Callable[[], Any],  # noqa: IND101
+) -> Any:
+    """Данные ответа из кеша, при промахе - через build()"""
+
+    data = hot_cache.get_versioned(_namespace(post_id), _key(request, max_depth))
+    if data is None:
+        with read_from_primary():
+            data = build()
+
+        hot_cache.set_versioned(
+            _namespace(post_id),
+            _key(request, max_depth),
+            data,
+            COMMENT_TREE_TIMEOUT,
+        )
+
+    return data
+
+
+async def acached_post_comments(
+    post_id: int,  # noqa: IND101
+    max_depth: Optional[int],  # noqa: IND101
+    request: Request,  # noqa: IND101
+    build: Callable[[], Awaitable[Any]],  # noqa: IND101
+) -> Any:
+    """cached_post_comments для async-представлений: build() - корутина"""
+
+    data = await hot_cache.aget_versioned(
+        _namespace(post_id),
+        _key(request, max_depth),
+    )
+    if data is None:
+        with read_from_primary():
+            data = await build()
+
+        await hot_cache.aset_versioned(
+            _namespace(post_id),
+            _key(request, max_depth),
+            data,
+            COMMENT_TREE_TIMEOUT,
+        )
+
+    return data
+
+
+def invalidate_post_comments(post_ids: Iterable[int]) -> None:
+    post_ids = set(post_ids)
+
+    def bump() -> None:
+        for post_id in post_ids:
+            hot_cache.invalidate_namespace(_namespace(post_id))
+
+    transaction.on_commit(bump)
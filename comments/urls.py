@@ -5,6 +5,8 @@ urlpatterns = [
     path("", views.CommentListCreateView.as_view(), name="comment-list"),
     path("<int:pk>/", views.CommentDetailView.as_view(), name="comment-detail"),
     path("my-comments/", views.MyCommentsView.as_view(), name="my-comments"),
+    path("export/", views.CommentExportView.as_view(), name="comment-export"),
+    path("bulk/", views.CommentBulkView.as_view(), name="comment-bulk"),
     path("post/<int:post_id>/", views.post_comments, name="post-comments"),
     path("<int:comment_id>/replies/", views.comment_replies, name="comment-replies"),
 ]
@@ -1,25 +1,43 @@
-from typing import Type
+from collections import Counter
+from typing import Any, Type
 from django_filters.rest_framework import DjangoFilterBackend
 from django.shortcuts import get_object_or_404, render
+from django.utils import timezone
 from rest_framework import generics, status, permissions, serializers, filters
 from rest_framework.response import Response
 from rest_framework.request import Request
 
-from django.db.models import QuerySet
+from django.db.models import Max, Q, QuerySet
 from .models import Comment
 from .serializers import (
     CommentSerializer,
     CommentCreateSerializer,
     CommentUpdateSerializer,
     CommentDetailSerializer,
+    CommentBulkItemSerializer,
 )
 from .permissions import IsAuthorOrReadOnly
+from .tree import load_post_comment_tree
+from .tree_cache import cached_post_comments, invalidate_post_comments
+from app_sheep.lean_api import NonAtomicReadsMixin, non_atomic_reads
+from main.conditional import CollectionConditionalGetMixin, ConditionalGetMixin
+from accounts.models import User
+from main.bulk import BulkWriteView, ItemErrors
+from main.export import StreamingExportView
+from main.fieldsets import SparseFieldsetMixin
 from main.models import Post
+from main.pagination import FeedPagination
 from rest_framework.decorators import api_view, permission_classes
 
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(
+    NonAtomicReadsMixin,
+    SparseFieldsetMixin,
+    CollectionConditionalGetMixin,
+    generics.ListCreateAPIView,
+):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = FeedPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -31,11 +49,14 @@ class CommentListCreateView(generics.ListCreateAPIView):
     ordering = ["-created_at"]
 
     def get_queryset(self) -> QuerySet[Comment]:
-        return Comment.objects.filter(is_active=True).select_related(
-            "author",
-            "post",
-            "parent",
-        )
+        queryset = Comment.objects.filter(is_active=True).select_related("author")
+        if self.fieldset_includes("replies_count"):
+            queryset = queryset.with_replies_count()
+
+        return queryset
+
+    def get_validator_queryset(self) -> QuerySet[Comment]:
+        return self.filter_queryset(Comment.objects.filter(is_active=True))
 
     def get_serializer_class(self) -> Type[serializers.Serializer]:
         if self.request.method == "POST":
@@ -44,10 +65,30 @@ class CommentListCreateView(generics.ListCreateAPIView):
         return CommentSerializer
 
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Comment.objects.filter(is_active=True).select_related("author", "post")
+class CommentDetailView(
+    NonAtomicReadsMixin,
+    ConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
+    queryset = (
+        Comment.objects.filter(is_active=True)
+        .select_related("author")
+        .with_replies_count()
+    )
     serializer_class = CommentDetailSerializer
     permission_classes = [IsAuthorOrReadOnly]
+    validator_fields = (
+        "pk",
+        "updated_at",
+        "author__updated_at",
+        "active_replies_count",
+    )
+    validator_annotations = {
+        "replies_updated_at": Max(
+            "replies__updated_at",
+            filter=Q(replies__is_active=True),
+        ),
+    }
 
     def get_serializer_class(self) -> Type[serializers.Serializer]:
         if self.request.method in ["PUT", "PATCH"]:
@@ -56,9 +97,15 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         return CommentDetailSerializer
 
 
-class MyCommentsView(generics.ListAPIView):
+class MyCommentsView(
+    NonAtomicReadsMixin,
+    SparseFieldsetMixin,
+    CollectionConditionalGetMixin,
+    generics.ListAPIView,
+):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -70,46 +117,147 @@ class MyCommentsView(generics.ListAPIView):
     ordering = ["-created_at"]
 
     def get_queryset(self) -> QuerySet[Comment]:
-        return Comment.objects.filter(author=self.request.user).select_related(
-            "post",
-            "parent",
+        queryset = Comment.objects.filter(author=self.request.user).select_related(
+            "author",
+        )
+        if self.fieldset_includes("replies_count"):
+            queryset = queryset.with_replies_count()
+
+        return queryset
+
+    def get_validator_queryset(self) -> QuerySet[Comment]:
+        return self.filter_queryset(Comment.objects.filter(author=self.request.user))
+
+
+class CommentExportView(StreamingExportView):
+    queryset = Comment.objects.all()
+    filterset_fields = ["post", "author", "parent", "is_active"]
+    export_name = "comments"
+    export_fields = (
+        "id",
+        "post_id",
+        "author_id",
+        "parent_id",
+        "content",
+        "is_active",
+        "created_at",
+        "updated_at",
+    )
+
+
+class CommentBulkView(BulkWriteView):
+    serializer_class = CommentBulkItemSerializer
+
+    def perform_bulk_create(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        published = set(
+            Post.objects.filter(
+                id__in={item["post"] for item in items.values()},
+                status="published",
+            ).values_list("id", flat=True),
+        )
+        parent_posts = dict(
+            Comment.objects.filter(
+                id__in={item.get("parent") for item in items.values()} - {None},
+            ).values_list("id", "post_id"),
+        )
+
+        comments = {}
+        for index, item in items.items():
+            parent_id = item.get("parent")
+            if item["post"] not in published:
+                errors[index] = {"post": ["Post not found"]}
+            elif parent_id is not None and parent_id not in parent_posts:
+                errors[index] = {"parent": ["Parent comment not found"]}
+            elif parent_id is not None and parent_posts[parent_id] != item["post"]:
+                errors[index] = {
+                    "parent": ["Parent comment must belong to the same post"],
+                }
+            else:
+                comments[index] = Comment(
+                    post_id=item["post"],
+                    parent_id=parent_id,
+                    content=item["content"],
+                    author=self.request.user,
+                )
+
+        Comment.objects.bulk_create(comments.values())
+        # bulk_create не отправляет сигналы - счетчики обновляем явно
+        Post.adjust_comments_count(
+            Counter(comment.post_id for comment in comments.values()),
         )
+        User.adjust_counter("comments_count", {self.request.user.id: len(comments)})
+        invalidate_post_comments(comment.post_id for comment in comments.values())
+        return comments
+
+    def perform_bulk_update(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        # Скрытые комментарии не правятся, как и в CommentDetailView
+        own_comments = Comment.objects.filter(
+            author=self.request.user,
+            is_active=True,
+        ).in_bulk(
+            [item["id"] for item in items.values()],
+        )
+
+        comments = {}
+        now = timezone.now()
+        for index, item in items.items():
+            comment = own_comments.get(item["id"])
+            if comment is None:
+                errors[index] = {"id": ["Comment not found"]}
+                continue
 
+            if "content" in item:
+                comment.content = item["content"]
 
+            comment.updated_at = now
+            comments[index] = comment
+
+        Comment.objects.bulk_update(comments.values(), ["content", "updated_at"])
+        invalidate_post_comments(comment.post_id for comment in comments.values())
+        return comments
+
+
+@non_atomic_reads
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def post_comments(request: Request, post_id: int) -> Response:
-    post = get_object_or_404(Post, id=post_id, status="published")
-    comments = (
-        Comment.objects.filter(post=post, parent=None, is_active=True)
-        .select_related("author")
-        .prefetch_related("replies_author")
-        .order_by("-created_at")
-    )
-    serializer = CommentDetailSerializer(
-        comments,
-        many=True,
-        context={"request": request},
-    )
-    return Response(
-        {
+    depth = serializers.IntegerField(min_value=1, required=False, allow_null=True)
+    max_depth = depth.run_validation(request.query_params.get("depth"))
+
+    def build() -> dict[str, Any]:
+        post = get_object_or_404(Post, id=post_id, status="published")
+        comments = load_post_comment_tree(post.id, max_depth=max_depth)
+        serializer = CommentDetailSerializer(
+            comments,
+            many=True,
+            context={"request": request},
+        )
+        return {
             "post": {"id": post.id, "title": post.title, "slug": post.slug},
             "comments": serializer.data,
-            "comment_count": post.comments.filter(is_active=True).count(),
-        },
-    )
+            "comment_count": post.comments_count,
+        }
 
+    return Response(cached_post_comments(post_id, max_depth, request, build))
 
+
+@non_atomic_reads
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def comment_replies(request: Request, comment_id: int) -> Response:
-    parent_comment = get_object_or_404(Comment, id=comment_id, is_active=True)
+    parent_comment = get_object_or_404(
+        Comment.objects.select_related("author"),
+        id=comment_id,
+        is_active=True,
+    )
 
-    replies = (
+    replies = list(
         Comment.objects.filter(parent=parent_comment, is_active=True)
         .select_related("author")
-        .order_by("created_at")
+        .with_replies_count()
+        .order_by("created_at"),
     )
+    parent_comment.active_replies_count = len(replies)
 
     serializer = CommentSerializer(replies, many=True, context={"request": request})
     return Response(
@@ -119,6 +267,6 @@ def comment_replies(request: Request, comment_id: int) -> Response:
                 context={"request": request},
             ).data,
             "replies": serializer.data,
-            "replies_count": replies.count(),
+            "replies_count": len(replies),
         },
     )
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# settings отключают постоянные соединения под ASGI
+os.environ.setdefault("DJANGO_ASGI", "true")
 
 application = get_asgi_application()
@@ -68,7 +68,7 @@ INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",  # Доступы
@@ -81,10 +81,10 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ],
     "DEFAULT_RENDERER_CLASSES": [
-        "rest_framework.renderers.JSONRenderer",  # Рендеринг в JSON
+        "app_sheep.fast_json.FastJSONRenderer",  # Рендеринг в JSON (orjson)
     ],
     "DEFAULT_PARSER_CLASSES": [  # Парсинг данных
-        "rest_framework.parsers.JSONParser",
+        "app_sheep.fast_json.FastJSONParser",
         "rest_framework.parsers.MultiPartParser",
         "rest_framework.parsers.FormParser",
     ],
@@ -92,16 +92,25 @@ REST_FRAMEWORK = {
 
 
 MIDDLEWARE = [
+    "app_sheep.instrumentation.PerformanceInstrumentationMiddleware",
+    "app_sheep.db_routing.ReplicaRoutingMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # Сессии, CSRF, auth и messages - только вне API (app_sheep.lean_api)
+    "app_sheep.lean_api.LeanSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "app_sheep.lean_api.LeanCsrfViewMiddleware",
+    "app_sheep.lean_api.LeanAuthenticationMiddleware",
+    "app_sheep.lean_api.LeanMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+LEAN_API = {
+    "PATH_PREFIXES": ["/api/"],
+    # Чтения API без транзакции ATOMIC_REQUESTS
+    "ATOMIC_READS": config("API_ATOMIC_READS", default=False, cast=bool),
+}
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -129,13 +138,99 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        # django.db.backends.postgresql + время соединения в app_sheep.db_pool
+        "ENGINE": "app_sheep.db_backends.postgresql",
         "NAME": os.getenv("POSTGRES_DB", "postgres"),
         "USER": os.getenv("POSTGRES_USER", "postgres"),
         "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
         "HOST": os.getenv("HOST", "localhost"),
         "PORT": os.getenv("PORT", 5432),
         "ATOMIC_REQUESTS": True,
+        # Постоянные соединения: живут POSTGRES_CONN_MAX_AGE секунд в потоке
+        # воркера и проверяются перед повторным использованием
+        "CONN_MAX_AGE": config("POSTGRES_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": config(
+            "POSTGRES_CONN_HEALTH_CHECKS",
+            default=True,
+            cast=bool,
+        ),
+    },
+}
+
+# Под ASGI (config/asgi.py) запрос может обслуживаться в другом потоке, и
+# постоянные соединения копятся без переиспользования - Django их не советует
+if config("DJANGO_ASGI", default=False, cast=bool):
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+
+# Пул соединений psycopg 3 (psycopg[pool] из requirements): заменяет
+# постоянные соединения, pool_stats показывает его очередь и ожидание
+if config("POSTGRES_POOL", default=False, cast=bool):
+    from psycopg_pool import ConnectionPool
+
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": config("POSTGRES_POOL_MIN_SIZE", default=2, cast=int),
+            "max_size": config("POSTGRES_POOL_MAX_SIZE", default=10, cast=int),
+            "max_lifetime": config(
+                "POSTGRES_POOL_MAX_LIFETIME",
+                default=1800,
+                cast=int,
+            ),
+            "timeout": config("POSTGRES_POOL_TIMEOUT", default=10, cast=int),
+            "check": ConnectionPool.check_connection,
+        },
+    }
+
+# Реплики для чтения (app_sheep.db_routing): хосты через запятую
+for index, host in enumerate(
+    filter(None, config("POSTGRES_REPLICA_HOSTS", default="").split(",")),
+    start=1,
+):
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host.strip(),
+        "ATOMIC_REQUESTS": False,
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["app_sheep.db_routing.PrimaryReplicaRouter"]
+DATABASE_ROUTING = {
+    "REPLICAS": [alias for alias in DATABASES if alias.startswith("replica_")],
+    # сколько секунд после записи клиент читает только с primary
+    "PIN_SECONDS": config("DATABASE_PRIMARY_PIN_SECONDS", default=5, cast=int),
+}
+
+# Кеш: Redis в production (REDIS_URL), память процесса для разработки и тестов
+REDIS_URL = config("REDIS_URL", default="")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django_redis.cache.RedisCache",
+            "LOCATION": REDIS_URL,
+            "OPTIONS": {
+                "CLIENT_CLASS": "django_redis.client.DefaultClient",
+            },
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        },
+    }
+
+# Горячие чтения (справочники, ленты, деревья комментариев): LRU в памяти
+# процесса перед "default", см. app_sheep.tiered_cache
+CACHES["hot"] = {
+    "BACKEND": "app_sheep.tiered_cache.TieredCache",
+    "LOCATION": "hot",
+    "OPTIONS": {
+        "SHARED": "default",
+        "MAX_ENTRIES": config("HOT_CACHE_MAX_ENTRIES", default=1000, cast=int),
+        "LOCAL_TIMEOUT": 5,
+        "VERSION_CHECK_INTERVAL": 1,
     },
 }
 
@@ -159,8 +254,8 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
+    "REFRESH_TOKEN_LIFETIME": timedelta(days=15),
     "ROTATE_REFRESH_TOKENS": True,
     "BLACKLIST_AFTER_ROTATION": True,
     "UPDATE_LAST_LOGIN": True,
@@ -171,7 +266,25 @@ SIMPLE_JWT = {
     "AUTH_HEADER_NAME": "HTTP_AUTHORIZATION",
     "USER_ID_FIELD": "id",
     "USER_ID_CLAIM": "user_id",
+    # Отзыв через accounts.revocation, а не приложение token_blacklist
+    "AUTH_TOKEN_CLASSES": ("accounts.revocation.RevocableAccessToken",),
+    "TOKEN_REFRESH_SERIALIZER": "accounts.revocation.RevocableTokenRefreshSerializer",
+}
+
+# Отзыв JWT (accounts.revocation): размер bloom-фильтра рассчитан на
+# EXPECTED_TOKENS неистекших отзывов с долей ложных срабатываний
+# FALSE_POSITIVE_RATE, интервалы - в секундах
+TOKEN_REVOCATION = {
+    "EXPECTED_TOKENS": config(
+        "TOKEN_REVOCATION_EXPECTED_TOKENS",
+        default=1_000_000,
+        cast=int,
+    ),
+    "FALSE_POSITIVE_RATE": 0.001,
+    "SYNC_INTERVAL": 1,
+    "REBUILD_INTERVAL": 60 * 60,
 }
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -183,12 +296,6 @@ USE_I18N = True
 
 USE_TZ = True
 
-SIMPLE_JWT = {
-    "ACCESS_TOKEN_LIFETIME": timedelta(days=1),
-    "REFRESH_TOKEN_LIFETIME": timedelta(days=15),
-}
-
-
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -233,7 +340,63 @@ LOGGING = {
             "level": "INFO",
             "propagate": True,
         },
+        "app_sheep.instrumentation": {
+            "handlers": ["file"],
+            "level": "INFO",
+            "propagate": False,
+        },
     },
 }
 
 AUTH_USER_MODEL = "accounts.User"
+
+# время жизни пользователя в кеше аутентификации (accounts.user_cache), секунды
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)
+
+# last_login пишется не чаще раза в столько секунд (accounts.last_login)
+AUTH_LAST_LOGIN_INTERVAL = config(
+    "AUTH_LAST_LOGIN_INTERVAL",
+    default=60 * 60,
+    cast=int,
+)
+
+# буфер просмотров постов (main.view_counter)
+VIEW_COUNTER = {
+    "BACKEND": config(
+        "VIEW_COUNTER_BACKEND",
+        default="main.view_counter.LocalMemoryViewCountStore",
+    ),
+    "FLUSH_INTERVAL": config("VIEW_COUNTER_FLUSH_INTERVAL", default=10, cast=int),
+    "FLUSH_THRESHOLD": config("VIEW_COUNTER_FLUSH_THRESHOLD", default=500, cast=int),
+}
+
+# рейтинг trending (main.trending): вес события затухает вдвое за HALF_LIFE_HOURS
+TRENDING = {
+    "HALF_LIFE_HOURS": config("TRENDING_HALF_LIFE_HOURS", default=12, cast=float),
+    "PUBLISH_WEIGHT": 10.0,
+    "VIEW_WEIGHT": 1.0,
+    "COMMENT_WEIGHT": 5.0,
+}
+
+# метрики запросов (app_sheep.instrumentation): JSON в лог, заголовок
+# Server-Timing раскрывает тайминги клиенту - по умолчанию только с DEBUG
+PERFORMANCE_INSTRUMENTATION = {
+    "SAMPLE_RATE": config("PERFORMANCE_SAMPLE_RATE", default=0.05, cast=float),
+    "SERVER_TIMING": config("PERFORMANCE_SERVER_TIMING", default=DEBUG, cast=bool),
+}
+
+# Celery: брокер по умолчанию - тот же Redis, что и кеш
+CELERY_BROKER_URL = config("CELERY_BROKER_URL", default=REDIS_URL)
+CELERY_TASK_IGNORE_RESULT = True
+
+# варианты изображений (app_sheep.image_variants): пул потоков, Celery -
+# только явно через IMAGE_VARIANTS_WORKER=celery при запущенном воркере
+IMAGE_VARIANTS = {
+    "WORKER": config("IMAGE_VARIANTS_WORKER", default="thread"),
+    "QUALITY": 80,
+    "SIZES": {
+        "thumbnail": (160, 160, True),
+        "card": (640, 360, True),
+        "full": (1600, 1600, False),
+    },
+}
@@ -6,4 +6,8 @@ urlpatterns = [
     path("api/v1/posts/", include("main.urls")),
     path("api/v1/auth/", include("accounts.urls")),
     path("api/v1/comments/", include("comments.urls")),
+    path("api/v1/system/", include("app_sheep.urls")),
+    # Async-варианты read-эндпоинтов для запуска под ASGI (config.asgi)
+    path("api/v1/async/posts/", include("main.async_urls")),
+    path("api/v1/async/comments/", include("comments.async_urls")),
 ]
@@ -13,10 +13,14 @@ class CategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {"slug": ("name",)}
     readonly_fields = ("created_at",)
 
-    def posts_count(self, obj: Category) -> str:  # noqa: CCE001
-        return obj.post.count()
+    def posts_count(self, obj: Category) -> int:  # noqa: CCE001
+        return obj.posts_count
 
     posts_count.short_description = "Post Count"  # type: ignore[attr-defined]
+    posts_count.admin_order_field = "posts_count"  # type: ignore[attr-defined]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Category]:  # noqa: CCE001
+        return super().get_queryset(request).with_posts_count()
 
 
 @admin.register(Post)
@@ -33,7 +37,7 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("status", "category", "created_at", "updated_at")
     search_fields = ("title", "count", "author__username")
     prepopulated_fields = {"slug": ("title",)}
-    readonly_fields = ("created_at", "updated_at", "views_count")
+    readonly_fields = ("created_at", "updated_at", "views_count", "comments_count")
     raw_id_fields = ("author",)
 
     fieldsets = (
@@ -42,16 +46,16 @@ class PostAdmin(admin.ModelAdmin):
         (
             "Statistics",
             {
-                "fields": ("views_count", "created_at", "updated_at"),
+                "fields": (
+                    "views_count",
+                    "comments_count",
+                    "created_at",
+                    "updated_at",
+                ),
                 "classes": ("collapse",),
             },
         ),
     )
 
-    def comments_count(self, obj: Post) -> str:  # noqa: CCE001
-        return obj.comments.count()
-
-    comments_count.short_description = "Comments"  # type: ignore[attr-defined]
-
     def get_queryset(self, request: HttpRequest) -> QuerySet[Post]:  # noqa: CCE001
         return super().get_queryset(request).select_related("author", "category")
@@ -0,0 +1,133 @@
+"""
+Асинхронные (ASGI) варианты read-представлений DRF.
+
+DRF 3.16 не умеет async-обработчики, поэтому dispatch переопределен: проверки
+initial() (аутентификация может сходить в БД, троттлинг - в кеш) идут через
+sync_to_async, обработчик ждется в event loop и читает данные async ORM, а
+ответ рендерится сразу, без отдельного потока на response.render(). Только
+безопасные методы: ATOMIC_REQUESTS с async-представлениями несовместим.
+"""
+
+import inspect
+from typing import Any, Callable
+
+from asgiref.sync import sync_to_async
+from django.db import models
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
+from django.shortcuts import aget_object_or_404
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from app_sheep.lean_api import non_atomic_reads
+
+from .conditional import get_not_modified_response, make_validators
+
+
+class AsyncAPIViewMixin:
+    """Ставится перед APIView-классом; обработчики get/head - корутины"""
+
+    http_method_names = ["get", "head", "options"]
+
+    @classmethod
+    def as_view(cls, **initkwargs: Any) -> Callable:
+        return non_atomic_reads(super().as_view(**initkwargs))
+
+    async def dispatch(
+        self,  # noqa: IND101
+        request: HttpRequest,  # noqa: IND101
+        *args: Any,  # noqa: IND101
+        **kwargs: Any,  # noqa: IND101
+    ) -> HttpResponseBase:
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self,
+                    request.method.lower(),
+                    self.http_method_not_allowed,
+                )
+            else:
+                handler = self.http_method_not_allowed
+
+            # options() у APIView синхронный и в БД не ходит
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        if isinstance(self.response, Response):
+            self.response = self.render(self.response)
+
+        return self.response
+
+    def render(self, response: Response) -> HttpResponse:
+        content = response.rendered_content
+        rendered = HttpResponse(
+            content,
+            status=response.status_code,
+            headers=dict(response.items()),
+        )
+        rendered.cookies = response.cookies
+        return rendered
+
+
+class AsyncConditionalGetMixin:
+    """Async-вариант ConditionalGetMixin/CollectionConditionalGetMixin"""
+
+    async def get(self, request: Request, *args: Any, **kwargs: Any) -> Any:
+        row = await self.aget_validator_row()
+        if row is None:
+            return await super().get(request, *args, **kwargs)
+
+        etag, last_modified = make_validators(row)
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            await sync_to_async(self.not_modified)(row)
+        else:
+            response = await super().get(request, *args, **kwargs)
+
+        return self.add_validators(response, etag, last_modified)
+
+
+class AsyncListModelMixin:
+    async def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await self.alist(request, *args, **kwargs)
+
+    async def alist(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # Фильтры могут проверять значения запросами к БД (ModelChoiceFilter)
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(queryset, request, self)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+
+        serializer = self.get_serializer([obj async for obj in queryset], many=True)
+        return Response(serializer.data)
+
+
+class AsyncRetrieveModelMixin:
+    async def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return await self.aretrieve(request, *args, **kwargs)
+
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        instance = await self.aget_object()
+        return Response(self.get_serializer(instance).data)
+
+    async def aget_object(self) -> models.Model:
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        instance = await aget_object_or_404(
+            queryset,
+            **{self.lookup_field: self.kwargs[lookup_url_kwarg]},
+        )
+        self.check_object_permissions(self.request, instance)
+        return instance
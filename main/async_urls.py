@@ -0,0 +1,21 @@
+from django.urls import path
+from . import async_views
+
+urlpatterns = [
+    path("", async_views.AsyncPostListView.as_view(), name="async-post-list"),
+    path(
+        "popular/",
+        async_views.AsyncPopularPostsView.as_view(),
+        name="async-popular-posts",
+    ),
+    path(
+        "recent/",
+        async_views.AsyncRecentPostsView.as_view(),
+        name="async-recent-posts",
+    ),
+    path(
+        "<slug:slug>/",
+        async_views.AsyncPostDetailView.as_view(),
+        name="async-post-detail",
+    ),
+]
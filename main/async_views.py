@@ -0,0 +1,86 @@
+"""
+Async-варианты read-эндпоинтов постов (монтируются под /api/v1/async/).
+
+Фильтры, поиск, сортировка, наборы полей и пагинация - те же, что у
+синхронных представлений: классы наследуют их настройки.
+"""
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from rest_framework import permissions, views
+from rest_framework.request import Request
+from rest_framework.response import Response
+from django.http import HttpResponse
+
+from .async_api import (
+    AsyncAPIViewMixin,
+    AsyncConditionalGetMixin,
+    AsyncListModelMixin,
+    AsyncRetrieveModelMixin,
+)
+from .feed_cache import POPULAR_FEED, RECENT_FEED, acached_feed_response
+from .models import Post
+from .serializers import PostListSerializer
+from .view_counter import record_view
+from .views import PostDetailView, PostListCreateView
+
+
+class AsyncPostListView(
+    AsyncAPIViewMixin,
+    AsyncConditionalGetMixin,
+    AsyncListModelMixin,
+    PostListCreateView,
+):
+    pass
+
+
+class AsyncPostDetailView(
+    AsyncAPIViewMixin,
+    AsyncConditionalGetMixin,
+    AsyncRetrieveModelMixin,
+    PostDetailView,
+):
+    async def aretrieve(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        instance = await self.aget_object()
+        # Буфер просмотров может сбросить счетчики в БД
+        await sync_to_async(record_view)(instance.pk)
+        instance.views_count += 1
+        return Response(self.get_serializer(instance).data)
+
+
+async def _feed_posts(ordering: str, request: Request) -> Any:
+    posts = (
+        Post.objects.with_excerpt()
+        .filter(status="published")
+        .select_related("author", "category")
+        .order_by(ordering)[:10]
+    )
+    return PostListSerializer(
+        [post async for post in posts],
+        many=True,
+        context={"request": request},
+    ).data
+
+
+class AsyncPopularPostsView(AsyncAPIViewMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request: Request) -> HttpResponse:
+        return await acached_feed_response(
+            POPULAR_FEED,
+            request,
+            lambda: _feed_posts("-views_count", request),
+            timeout=60,
+        )
+
+
+class AsyncRecentPostsView(AsyncAPIViewMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    async def get(self, request: Request) -> HttpResponse:
+        return await acached_feed_response(
+            RECENT_FEED,
+            request,
+            lambda: _feed_posts("-created_at", request),
+        )
@@ -0,0 +1,524 @@
+"""
+Нагрузочный замер горячих эндпоинтов на сгенерированных данных.
+
+Данные (пользователи, категории, посты, дерево комментариев) создаются
+bulk_create внутри транзакции, которая откатывается после замеров; кеш на
+время замеров подменяется отдельным locmem, а просмотры постов не пишутся.
+Для каждого эндпоинта снимаются число запросов, время БД, время ответа и
+размер тела: первый запрос - на пустом кеше (cold), остальные - warm.
+benchmark_json сравнивает рендеринг и разбор тех же данных stdlib и orjson,
+benchmark_async - синхронные и async-варианты read-эндпоинтов под ASGI,
+benchmark_pipeline - полный стек middleware и транзакций против облегченного.
+"""
+
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
+from io import BytesIO, StringIO
+from typing import Any, Callable, Iterator, Optional
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import User
+from app_sheep.tiered_cache import HOT_CACHE_ALIAS, hot_cache
+from comments.models import Comment
+
+from . import view_counter
+from .models import Category, Post
+from .trending import refresh_trending_scores
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua"
+).split()
+
+
+@dataclass
+class Dataset:
+    users: list[User]
+    categories: list[Category]
+    posts: list[Post]
+    comments: int
+
+    def summary(self) -> dict[str, int]:
+        return {
+            "users": len(self.users),
+            "categories": len(self.categories),
+            "posts": len(self.posts),
+            "comments": self.comments,
+        }
+
+
+@dataclass
+class Endpoint:
+    name: str
+    path: str
+    user: Optional[User] = None
+
+
+class _DiscardViewCountStore(view_counter.BaseViewCountStore):
+    def incr(self, post_id: int, amount: int = 1) -> None:
+        pass
+
+    def drain(self) -> dict[int, int]:
+        return {}
+
+    def should_flush(self) -> bool:
+        return False
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize() + "."
+
+
+def seed_data(
+    users: int,  # noqa: IND101
+    categories: int,  # noqa: IND101
+    posts: int,  # noqa: IND101
+    comments: int,  # noqa: IND101
+    replies: int,  # noqa: IND101
+    depth: int,  # noqa: IND101
+    seed: int = 0,  # noqa: IND101
+) -> Dataset:
+    """
+    comments - корневых комментариев на пост, replies - ответов на каждый
+    комментарий на уровнях ниже, до depth уровней вложенности.
+    """
+
+    rng = random.Random(seed)
+    # Префикс не пересекается с существующими slug/email
+    run = uuid.uuid4().hex[:8]
+    password = make_password(None)
+
+    created_users = User.objects.bulk_create(
+        User(
+            username=f"bench_{run}_{index}",
+            email=f"bench_{run}_{index}@example.com",
+            password=password,
+            bio=_text(rng, 20),
+        )
+        for index in range(users)
+    )
+    created_categories = Category.objects.bulk_create(
+        Category(
+            name=f"Benchmark {run} {index}",
+            slug=f"benchmark-{run}-{index}",
+            description=_text(rng, 15),
+        )
+        for index in range(categories)
+    )
+    created_posts = Post.objects.bulk_create(
+        Post(
+            title=_text(rng, 6),
+            slug=f"benchmark-{run}-{index}",
+            content=_text(rng, 300),
+            status="published" if rng.random() < 0.9 else "draft",
+            views_count=rng.randint(0, 5000),
+            author=rng.choice(created_users),
+            category=(
+                rng.choice(created_categories)
+                if created_categories and rng.random() < 0.9
+                else None
+            ),
+        )
+        for index in range(posts)
+    )
+
+    total_comments = 0
+    level: list[Comment] = [
+        Comment(post=post, parent=None)
+        for post in created_posts
+        for _ in range(comments)
+    ]
+    for _ in range(depth):
+        for comment in level:
+            comment.author = rng.choice(created_users)
+            comment.content = _text(rng, rng.randint(5, 60))
+
+        level = Comment.objects.bulk_create(level)
+        total_comments += len(level)
+        level = [
+            Comment(post_id=parent.post_id, parent=parent)
+            for parent in level
+            for _ in range(replies)
+        ]
+
+    # bulk_create не вызывает сигналы: счетчики и рейтинг пересчитываются разом
+    call_command("reconcile_counters", stdout=StringIO())
+    refresh_trending_scores()
+    for model, objects in ((User, created_users), (Post, created_posts)):
+        fresh = model.objects.in_bulk([obj.pk for obj in objects])
+        objects[:] = [fresh[obj.pk] for obj in objects]
+
+    return Dataset(created_users, created_categories, created_posts, total_comments)
+
+
+def default_endpoints(dataset: Dataset) -> list[Endpoint]:
+    published = [post for post in dataset.posts if post.status == "published"]
+    busiest = max(published, key=lambda post: post.comments_count)
+    author = max(dataset.users, key=lambda user: user.posts_count)
+    return [
+        Endpoint("post_list", reverse("post-list")),
+        Endpoint("post_list_search", reverse("post-list") + "?search=lorem"),
+        Endpoint("post_detail", reverse("post-detail", kwargs={"slug": busiest.slug})),
+        Endpoint(
+            "post_comments",
+            reverse("post-comments", kwargs={"post_id": busiest.pk}),
+        ),
+        Endpoint("category_list", reverse("category-list")),
+        Endpoint("category_list_search", reverse("category-list") + "?search=a"),
+        Endpoint("trending_posts", reverse("trending-posts")),
+        Endpoint("profile", reverse("profile"), user=author),
+    ]
+
+
+def _timed_request(client: Client, endpoint: Endpoint, headers: dict) -> dict:
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = client.get(endpoint.path, headers=headers)
+        elapsed = time.perf_counter() - started
+
+    return {
+        "status": response.status_code,
+        "queries": len(queries),
+        "db_time_ms": round(
+            sum(float(query["time"]) for query in queries.captured_queries) * 1000,
+            3,
+        ),
+        "time_ms": round(elapsed * 1000, 3),
+        "bytes": len(response.content),
+    }
+
+
+def measure(endpoint: Endpoint, repeat: int) -> dict[str, Any]:
+    client = Client()
+    headers = {}
+    if endpoint.user is not None:
+        token = RefreshToken.for_user(endpoint.user).access_token
+        headers["authorization"] = f"Bearer {token}"
+
+    # Оба уровня: память процесса и общий кеш
+    hot_cache.clear()
+    cold = _timed_request(client, endpoint, headers)
+    warm = [_timed_request(client, endpoint, headers) for _ in range(repeat)]
+    warm_times = [run["time_ms"] for run in warm] or [cold["time_ms"]]
+    return {
+        "endpoint": endpoint.name,
+        "path": endpoint.path,
+        "status": cold["status"],
+        "bytes": cold["bytes"],
+        "cold": cold,
+        "warm": {
+            "queries": max((run["queries"] for run in warm), default=cold["queries"]),
+            "time_ms_min": min(warm_times),
+            "time_ms_median": round(statistics.median(warm_times), 3),
+            "time_ms_max": max(warm_times),
+        },
+    }
+
+
+@contextmanager
+def isolated_environment() -> Iterator[None]:
+    """Отдельный кеш, выключенные буфер просмотров и реплики на время замеров"""
+
+    saved_store = view_counter._store
+    view_counter._store = _DiscardViewCountStore()
+    try:
+        with override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                    "LOCATION": "benchmark",
+                },
+                HOT_CACHE_ALIAS: {
+                    **settings.CACHES[HOT_CACHE_ALIAS],
+                    "LOCATION": "benchmark",
+                },
+            },
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            # Данные замера живут в незакоммиченной транзакции primary
+            DATABASE_ROUTING={
+                **getattr(settings, "DATABASE_ROUTING", {}),
+                "REPLICAS": [],
+            },
+        ):
+            yield
+    finally:
+        view_counter._store = saved_store
+
+
+def run_benchmark(
+    dataset: Dataset,  # noqa: IND101
+    repeat: int,  # noqa: IND101
+    endpoints: Optional[Callable[[Dataset], list[Endpoint]]] = None,  # noqa: IND101
+) -> dict[str, Any]:
+    results = [
+        measure(endpoint, repeat)
+        for endpoint in (endpoints or default_endpoints)(dataset)
+    ]
+    return {
+        "database": connection.vendor,
+        "dataset": dataset.summary(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def json_payloads(dataset: Dataset) -> dict[str, Any]:
+    """Данные страницы постов и дерева комментариев - до рендеринга"""
+
+    from comments.serializers import CommentDetailSerializer
+    from comments.tree import load_post_comment_tree
+
+    from .serializers import PostListSerializer
+
+    context = {"request": Request(RequestFactory().get("/"))}
+    posts = (
+        Post.objects.with_excerpt()
+        .filter(status="published")
+        .select_related("author", "category")
+        .order_by("-created_at")[: api_settings.PAGE_SIZE]
+    )
+    busiest = max(dataset.posts, key=lambda post: post.comments_count)
+    return {
+        "post_list": PostListSerializer(posts, many=True, context=context).data,
+        "comment_tree": CommentDetailSerializer(
+            load_post_comment_tree(busiest.pk, max_depth=None),
+            many=True,
+            context=context,
+        ).data,
+    }
+
+
+def benchmark_json(payloads: dict[str, Any], repeat: int) -> list[dict[str, Any]]:
+    """Время рендеринга и разбора каждого payload stdlib- и orjson-версиями"""
+
+    from app_sheep import fast_json
+
+    if fast_json.orjson is None:
+        raise ImproperlyConfigured("orjson is not installed")
+
+    pairs = {
+        "stdlib": (JSONRenderer(), JSONParser()),
+        "orjson": (fast_json.FastJSONRenderer(), fast_json.FastJSONParser()),
+    }
+
+    def best_of(func: Callable[[], Any]) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - started)
+
+        return round(min(timings) * 1000, 3)
+
+    results = []
+    for name, data in payloads.items():
+        content = pairs["stdlib"][0].render(data)
+        if pairs["orjson"][0].render(data) != content:
+            raise ImproperlyConfigured(f"Renderers disagree on {name}")
+
+        result: dict[str, Any] = {"payload": name, "bytes": len(content)}
+        for backend, (renderer, parser) in pairs.items():
+            result[backend] = {
+                "render_ms": best_of(partial(renderer.render, data)),
+                "parse_ms": best_of(
+                    lambda parser=parser: parser.parse(BytesIO(content))
+                ),
+            }
+
+        result["render_speedup"] = round(
+            result["stdlib"]["render_ms"] / max(result["orjson"]["render_ms"], 0.001),
+            2,
+        )
+        result["parse_speedup"] = round(
+            result["stdlib"]["parse_ms"] / max(result["orjson"]["parse_ms"], 0.001),
+            2,
+        )
+        results.append(result)
+
+    return results
+
+
+def async_endpoints(dataset: Dataset) -> list[tuple[Endpoint, Endpoint]]:
+    """Пары (синхронный, async) одного и того же ресурса"""
+
+    published = [post for post in dataset.posts if post.status == "published"]
+    busiest = max(published, key=lambda post: post.comments_count)
+    comment = (
+        Comment.objects.filter(post=busiest, parent=None, is_active=True)
+        .order_by("pk")
+        .first()
+    )
+    pairs = [
+        ("post_list", {}),
+        ("post_detail", {"slug": busiest.slug}),
+        ("popular_posts", {}),
+        ("recent_posts", {}),
+        ("post_comments", {"post_id": busiest.pk}),
+    ]
+    if comment is not None:
+        pairs.append(("comment_replies", {"comment_id": comment.pk}))
+
+    return [
+        (
+            Endpoint(name, reverse(name.replace("_", "-"), kwargs=kwargs)),
+            Endpoint(
+                f"{name}_async",
+                reverse(f"async-{name.replace('_', '-')}", kwargs=kwargs),
+            ),
+        )
+        for name, kwargs in pairs
+    ]
+
+
+async def _load(path: str, requests: int, concurrency: int) -> dict[str, Any]:
+    """requests запросов к path, не больше concurrency одновременно"""
+
+    client = AsyncClient()
+    semaphore = asyncio.Semaphore(concurrency)
+    timings: list[float] = []
+    statuses: set[int] = set()
+
+    async def one() -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get(path)
+            timings.append(time.perf_counter() - started)
+            statuses.add(response.status_code)
+
+    first = await client.get(path)
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - started
+
+    timings.sort()
+    return {
+        "statuses": sorted(statuses | {first.status_code}),
+        "body": json.loads(first.content),
+        "wall_ms": round(wall * 1000, 3),
+        "requests_per_second": round(requests / wall, 1),
+        "time_ms_median": round(statistics.median(timings) * 1000, 3),
+        "time_ms_p95": round(timings[int(len(timings) * 0.95) - 1] * 1000, 3),
+    }
+
+
+def benchmark_async(
+    dataset: Dataset,  # noqa: IND101
+    requests: int,  # noqa: IND101
+    concurrency: int,  # noqa: IND101
+) -> list[dict[str, Any]]:
+    """
+    Запросы идут через AsyncClient, то есть через async-стек middleware, как
+    под uvicorn: синхронное представление выполняется в потоке через
+    sync_to_async, async-вариант - в event loop.
+    """
+
+    results = []
+    for sync_endpoint, async_endpoint in async_endpoints(dataset):
+        result: dict[str, Any] = {"endpoint": sync_endpoint.name}
+        for mode, endpoint in (("sync", sync_endpoint), ("async", async_endpoint)):
+            hot_cache.clear()
+            result[mode] = {
+                "path": endpoint.path,
+                **async_to_sync(_load)(endpoint.path, requests, concurrency),
+            }
+
+        # Async-вариант обязан отдавать то же самое
+        result["same_body"] = result["sync"].pop("body") == result["async"].pop(
+            "body",
+        )
+        result["speedup"] = round(
+            result["async"]["requests_per_second"]
+            / max(result["sync"]["requests_per_second"], 0.001),
+            2,
+        )
+        results.append(result)
+
+    return results
+
+
+def benchmark_pipeline(dataset: Dataset, repeat: int) -> list[dict[str, Any]]:
+    """
+    Те же эндпоинты с полным стеком (сессии, CSRF, auth, messages и
+    транзакция на каждый запрос) и с облегченным путем API (lean_api).
+    """
+
+    modes = {
+        "full": {"PATH_PREFIXES": [], "ATOMIC_READS": True},
+        "lean": {**getattr(settings, "LEAN_API", {}), "ATOMIC_READS": False},
+    }
+    reports = {}
+    for mode, lean_api in modes.items():
+        with override_settings(LEAN_API=lean_api):
+            reports[mode] = {
+                result["endpoint"]: result
+                for result in run_benchmark(dataset, repeat)["results"]
+            }
+
+    results = []
+    for name, full in reports["full"].items():
+        lean = reports["lean"][name]
+        results.append(
+            {
+                "endpoint": name,
+                "path": full["path"],
+                **{
+                    mode: {
+                        "queries": result["warm"]["queries"],
+                        "time_ms_median": result["warm"]["time_ms_median"],
+                        "cold_time_ms": result["cold"]["time_ms"],
+                    }
+                    for mode, result in (("full", full), ("lean", lean))
+                },
+                "speedup": round(
+                    full["warm"]["time_ms_median"]
+                    / max(lean["warm"]["time_ms_median"], 0.001),
+                    2,
+                ),
+            },
+        )
+
+    return results
+
+
+def find_regressions(
+    report: dict[str, Any],  # noqa: IND101
+    baseline: dict[str, Any],  # noqa: IND101
+) -> list[str]:
+    """Эндпоинты, которым понадобилось больше запросов, чем в baseline"""
+
+    previous = {result["endpoint"]: result for result in baseline["results"]}
+    regressions = []
+    for result in report["results"]:
+        before = previous.get(result["endpoint"])
+        if before is None:
+            continue
+
+        for phase in ("cold", "warm"):
+            if result[phase]["queries"] > before[phase]["queries"]:
+                regressions.append(
+                    f"{result['endpoint']} ({phase}): "
+                    f"{before[phase]['queries']} -> {result[phase]['queries']} queries",
+                )
+
+    return regressions
@@ -0,0 +1,96 @@
+"""
+Базовое представление для пакетной записи (импорт, миграции данных).
+
+Каждый элемент массива проверяется сериализатором без запросов к БД, затем
+ссылки всех элементов проверяются пакетно (по одному запросу на тип), а
+корректные элементы записываются bulk_create/bulk_update в одной транзакции.
+Ошибки возвращаются по индексам элементов.
+"""
+
+from abc import ABCMeta, abstractmethod
+from typing import Any
+
+from django.db import transaction
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+ItemErrors = dict[int, Any]
+
+
+class BulkWriteView(generics.GenericAPIView, metaclass=ABCMeta):
+    permission_classes = [permissions.IsAuthenticated]
+    max_items = 500
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.handle_bulk(request, partial=False)
+
+    def patch(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        return self.handle_bulk(request, partial=True)
+
+    def handle_bulk(self, request: Request, partial: bool) -> Response:
+        if not isinstance(request.data, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of items."]})
+
+        if len(request.data) > self.max_items:
+            raise ValidationError(
+                {"non_field_errors": [f"No more than {self.max_items} items."]},
+            )
+
+        items: dict[int, dict[str, Any]] = {}
+        errors: ItemErrors = {}
+        for index, raw in enumerate(request.data):
+            serializer = self.get_serializer(data=raw, partial=partial)
+            if not serializer.is_valid():
+                errors[index] = serializer.errors
+            elif partial and "id" not in serializer.validated_data:
+                errors[index] = {"id": ["This field is required."]}
+            else:
+                items[index] = serializer.validated_data
+
+        with transaction.atomic():
+            if partial:
+                saved = self.perform_bulk_update(items, errors)
+            else:
+                saved = self.perform_bulk_create(items, errors)
+
+        return self.get_bulk_response(saved, errors, partial)
+
+    @abstractmethod
+    def perform_bulk_create(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        """Возвращает {index: объект}, ошибки пакетной проверки - в errors"""
+
+    @abstractmethod
+    def perform_bulk_update(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        """Как perform_bulk_create, для частичных элементов с id"""
+
+    def describe(self, instance: Any) -> dict[str, Any]:
+        return {"id": instance.pk}
+
+    def get_bulk_response(
+        self,  # noqa: IND101
+        saved: dict[int, Any],  # noqa: IND101
+        errors: ItemErrors,  # noqa: IND101
+        partial: bool,  # noqa: IND101
+    ) -> Response:
+        if not errors:
+            response_status = status.HTTP_200_OK if partial else status.HTTP_201_CREATED
+        elif not saved:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_207_MULTI_STATUS
+
+        return Response(
+            {
+                "updated" if partial else "created": [
+                    {"index": index, **self.describe(instance)}
+                    for index, instance in sorted(saved.items())
+                ],
+                "errors": [
+                    {"index": index, "errors": item_errors}
+                    for index, item_errors in sorted(errors.items())
+                ],
+            },
+            status=response_status,
+        )
@@ -0,0 +1,50 @@
+"""
+Кешированный справочник категорий (сайдбар фронтенда).
+
+Справочник строится одним сгруппированным запросом и сбрасывается при
+изменении категорий, а также при создании/удалении поста или смене его
+статуса либо категории. Хранится в двухуровневом кеше: сброс - новая версия
+пространства имен, которую увидят все процессы.
+"""
+
+from typing import Any
+
+from django.db import transaction
+
+from app_sheep.db_routing import read_from_primary
+from app_sheep.tiered_cache import hot_cache
+
+CATEGORY_DIRECTORY_NAMESPACE = "main:category_directory"
+CATEGORY_DIRECTORY_TIMEOUT = 60 * 10
+
+
+def get_category_directory() -> list[dict[str, Any]]:
+    directory = hot_cache.get_versioned(CATEGORY_DIRECTORY_NAMESPACE, "all")
+    if directory is None:
+        from .models import Category
+        from .serializers import CategorySerializer
+
+        with read_from_primary():
+            directory = [
+                dict(item)
+                for item in CategorySerializer(
+                    Category.objects.with_posts_count().order_by("name"),
+                    many=True,
+                ).data
+            ]
+
+        hot_cache.set_versioned(
+            CATEGORY_DIRECTORY_NAMESPACE,
+            "all",
+            directory,
+            CATEGORY_DIRECTORY_TIMEOUT,
+        )
+
+    return directory
+
+
+def invalidate_category_directory() -> None:
+    # После коммита, иначе параллельный запрос закеширует старые данные
+    transaction.on_commit(
+        lambda: hot_cache.invalidate_namespace(CATEGORY_DIRECTORY_NAMESPACE),
+    )
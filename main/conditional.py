@@ -0,0 +1,158 @@
+"""
+Условные GET-запросы (ETag / Last-Modified) для представлений DRF.
+
+Валидаторы считаются одним легким запросом (values()/aggregate() по индексу)
+до сериализации; при совпадении с If-None-Match / If-Modified-Since
+отдается 304 без тела.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponseBase
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.request import Request
+
+
+def make_validators(row: dict[str, Any]) -> tuple[str, Optional[float]]:
+    """Слабый ETag по значениям строки и Last-Modified по самой поздней дате"""
+
+    fingerprint = "|".join(f"{key}={row[key]}" for key in sorted(row))
+    etag = 'W/"%s"' % hashlib.md5(fingerprint.encode()).hexdigest()  # noqa: S324
+    dates = [value for value in row.values() if isinstance(value, datetime)]
+    last_modified = max(dates).timestamp() if dates else None
+    return etag, last_modified
+
+
+def get_not_modified_response(
+    request: Request,  # noqa: IND101
+    etag: str,  # noqa: IND101
+    last_modified: Optional[float],  # noqa: IND101
+) -> Optional[HttpResponseBase]:
+    return get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=last_modified and int(last_modified),
+    )
+
+
+class ConditionalGetMixin:
+    """
+    Для detail-представлений: валидаторы берутся из values() одной строки,
+    найденной по lookup_field (validator_fields + validator_annotations).
+    """
+
+    validator_fields: tuple[str, ...] = ("pk", "updated_at")
+    validator_annotations: dict[str, Any] = {}
+
+    def get_validator_values(self) -> QuerySet:
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = (
+            self.get_queryset()
+            .order_by()
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        )
+        if self.validator_annotations:
+            queryset = queryset.annotate(**self.validator_annotations)
+
+        return queryset.values(*self.validator_fields, *self.validator_annotations)
+
+    def get_validator_row(self) -> Optional[dict[str, Any]]:
+        return self.get_validator_values().first()
+
+    async def aget_validator_row(self) -> Optional[dict[str, Any]]:
+        return await self.get_validator_values().afirst()
+
+    def not_modified(self, row: dict[str, Any]) -> None:
+        """Хук для побочных эффектов GET, которые нужны и при ответе 304"""
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        row = self.get_validator_row()
+        if row is None:
+            # Нет строки (пусть обычный путь ответит 404) или валидатор не нужен
+            return super().get(request, *args, **kwargs)
+
+        etag, last_modified = make_validators(row)
+        response = get_not_modified_response(request, etag, last_modified)
+        if response is not None:
+            self.not_modified(row)
+        else:
+            response = super().get(request, *args, **kwargs)
+
+        return self.add_validators(response, etag, last_modified)
+
+    def add_validators(
+        self,  # noqa: IND101
+        response: HttpResponseBase,  # noqa: IND101
+        etag: str,  # noqa: IND101
+        last_modified: Optional[float],  # noqa: IND101
+    ) -> HttpResponseBase:
+        if response.status_code in (200, 304):
+            response.headers.setdefault("ETag", etag)
+            if last_modified:
+                response.headers.setdefault("Last-Modified", http_date(last_modified))
+
+        return response
+
+
+class CollectionConditionalGetMixin(ConditionalGetMixin):
+    """
+    Для списков: валидатор коллекции - max(updated_at) и количество строк
+    после фильтрации (плюс validator_aggregates представления).
+
+    Количество сохраняется в validator_total, и FeedPageNumberPagination
+    (main.pagination) не повторяет COUNT, поэтому get_validator_queryset
+    должен давать те же строки, что и список. Keyset-страницы (?cursor=)
+    отдаются без валидаторов: агрегат по всей выборке вернул бы им COUNT.
+    """
+
+    validator_aggregates: dict[str, Any] = {}
+    validator_total: Optional[int] = None
+
+    def get_validator_queryset(self) -> QuerySet:
+        """Переопределяется, чтобы не считать тяжелые аннотации списка"""
+
+        return self.filter_queryset(self.get_queryset())
+
+    def uses_validators(self) -> bool:
+        keyset_class = getattr(self.pagination_class, "keyset_class", None)
+        return (
+            keyset_class is None
+            or keyset_class.cursor_query_param not in self.request.query_params
+        )
+
+    def get_validator_row(self) -> Optional[dict[str, Any]]:
+        if not self.uses_validators():
+            return None
+
+        queryset = self.get_validator_queryset().order_by()
+        return self.set_validator_row(
+            queryset.aggregate(**self.get_validator_aggregates()),
+        )
+
+    async def aget_validator_row(self) -> Optional[dict[str, Any]]:
+        if not self.uses_validators():
+            return None
+
+        # Фильтры могут проверять значения запросами к БД (ModelChoiceFilter)
+        queryset = await sync_to_async(self.get_validator_queryset)()
+        return self.set_validator_row(
+            await queryset.order_by().aaggregate(**self.get_validator_aggregates()),
+        )
+
+    def set_validator_row(self, row: dict[str, Any]) -> dict[str, Any]:
+        self.validator_total = row["total"]
+        # Страница и фильтры - часть ресурса
+        row["query"] = self.request.META.get("QUERY_STRING", "")
+        return row
+
+    def get_validator_aggregates(self) -> dict[str, Any]:
+        return {
+            "last_updated": Max("updated_at"),
+            "total": Count("pk"),
+            **self.validator_aggregates,
+        }
@@ -0,0 +1,95 @@
+"""
+Потоковая выгрузка таблиц для аналитики (NDJSON / CSV), только для staff.
+
+Строки читаются через values_list().iterator(chunk_size) (на PostgreSQL -
+серверный курсор) и сразу пишутся в StreamingHttpResponse, поэтому память
+не растет с размером таблицы.
+"""
+
+import csv
+from datetime import datetime
+from typing import Any, Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.renderers import BaseRenderer
+from rest_framework.request import Request
+
+from app_sheep.lean_api import NonAtomicReadsMixin
+
+
+class _EchoBuffer:
+    def write(self, value: str) -> str:
+        return value
+
+
+class FirstRendererNegotiation(BaseContentNegotiation):
+    """Формат выгрузки задается ?output=, заголовок Accept не учитывается"""
+
+    def select_parser(self, request: Request, parsers: list) -> Any:
+        return parsers[0]
+
+    def select_renderer(
+        self,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        renderers: list[BaseRenderer],  # noqa: IND101
+        format_suffix: Any = None,  # noqa: IND101
+    ) -> tuple[BaseRenderer, str]:
+        return renderers[0], renderers[0].media_type
+
+
+def ndjson_lines(fields: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+def csv_lines(fields: tuple[str, ...], rows: Iterable[tuple]) -> Iterator[str]:
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(
+            value.isoformat() if isinstance(value, datetime) else value for value in row
+        )
+
+
+class StreamingExportView(NonAtomicReadsMixin, generics.GenericAPIView):
+    permission_classes = [permissions.IsAdminUser]
+    filter_backends = [DjangoFilterBackend]
+    content_negotiation_class = FirstRendererNegotiation
+    pagination_class = None
+    export_name = "export"
+    export_fields: tuple[str, ...] = ()
+    chunk_size = 2000
+
+    formats = {
+        "ndjson": ("application/x-ndjson", ndjson_lines),
+        "csv": ("text/csv", csv_lines),
+    }
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> StreamingHttpResponse:
+        output = request.query_params.get("output", "ndjson")
+        if output not in self.formats:
+            raise ValidationError(
+                {"output": f"Choose one of: {', '.join(self.formats)}"},
+            )
+
+        content_type, render_lines = self.formats[output]
+        rows = (
+            self.filter_queryset(self.get_queryset())
+            .order_by("pk")
+            .values_list(*self.export_fields)
+            .iterator(chunk_size=self.chunk_size)
+        )
+        response = StreamingHttpResponse(
+            render_lines(self.export_fields, rows),
+            content_type=f"{content_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="{self.export_name}.{output}"'
+        )
+        return response
@@ -0,0 +1,109 @@
+"""
+Кеш отрендеренных лент постов (popular, recent, посты категории).
+
+Ленты хранятся готовым JSON под версионированными ключами двухуровневого
+кеша (app_sheep.tiered_cache): сброс ленты - это инкремент ее версии, поэтому
+он не зависит от набора закешированных вариантов (хостов), а горячая лента
+отдается из памяти процесса без похода в Redis.
+"""
+
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from django.db import transaction
+from django.http import HttpResponse
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from app_sheep.db_routing import read_from_primary
+from app_sheep.tiered_cache import hot_cache
+
+FEED_TIMEOUT = 60 * 5
+POPULAR_FEED = "popular"
+RECENT_FEED = "recent"
+TRENDING_FEED = "trending"
+
+
+def category_feed(slug: str) -> str:
+    return f"category:{slug}"
+
+
+def trending_feed(slug: Optional[str] = None) -> str:
+    return f"{TRENDING_FEED}:{slug}" if slug else TRENDING_FEED
+
+
+def _namespace(feed: str) -> str:
+    return f"feed:{feed}"
+
+
+def cached_feed_response(
+    feed: str,  # noqa: IND101
+    request: Request,  # noqa: IND101
+    build: Callable[[], Any],  # noqa: IND101
+    timeout: int = FEED_TIMEOUT,  # noqa: IND101
+) -> HttpResponse:
+    """Отдает ленту из кеша, при промахе строит данные через build()"""
+
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    # Хост в ключе: ссылки на изображения в ленте абсолютные
+    content = hot_cache.get_versioned(_namespace(feed), request.get_host())
+    if content is None:
+        with read_from_primary():
+            content = renderer.render(build())
+
+        hot_cache.set_versioned(_namespace(feed), request.get_host(), content, timeout)
+
+    return HttpResponse(content, content_type=renderer.media_type)
+
+
+async def acached_feed_response(
+    feed: str,  # noqa: IND101
+    request: Request,  # noqa: IND101
+    build: Callable[[], Awaitable[Any]],  # noqa: IND101
+    timeout: int = FEED_TIMEOUT,  # noqa: IND101
+) -> HttpResponse:
+    """cached_feed_response для async-представлений: build() - корутина"""
+
+    renderer = api_settings.DEFAULT_RENDERER_CLASSES[0]()
+    content = await hot_cache.aget_versioned(_namespace(feed), request.get_host())
+    if content is None:
+        with read_from_primary():
+            content = renderer.render(await build())
+
+        await hot_cache.aset_versioned(
+            _namespace(feed),
+            request.get_host(),
+            content,
+            timeout,
+        )
+
+    return HttpResponse(content, content_type=renderer.media_type)
+
+
+def invalidate_feeds(feeds: Iterable[str]) -> None:
+    feeds = set(feeds)
+
+    def bump() -> None:
+        for feed in feeds:
+            hot_cache.invalidate_namespace(_namespace(feed))
+
+    transaction.on_commit(bump)
+
+
+def invalidate_post_feeds(category_ids: Iterable[Optional[int]]) -> None:
+    from .models import Category
+
+    category_ids = {pk for pk in category_ids if pk is not None}
+    slugs = (
+        Category.objects.filter(pk__in=category_ids).values_list("slug", flat=True)
+        if category_ids
+        else []
+    )
+    invalidate_feeds(
+        [
+            POPULAR_FEED,
+            RECENT_FEED,
+            trending_feed(),
+            *map(category_feed, slugs),
+            *map(trending_feed, slugs),
+        ],
+    )
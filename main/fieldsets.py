@@ -0,0 +1,114 @@
+"""
+Разреженные наборы полей для списков: ?fields=a,b или ?omit=c.
+
+Сериализатор отдает только выбранные поля, а представление сужает SELECT
+через only(): Meta.sparse_columns сериализатора сопоставляет полю колонки
+модели (для полей-методов и аннотаций - пустой кортеж или нужные колонки),
+поле без записи считается одноименной колонкой.
+"""
+
+from typing import Any, Iterable, Optional
+
+from django.db.models import QuerySet
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value: Optional[str]) -> list[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """Поля, не вошедшие в context["fieldset"], удаляются из сериализатора"""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        fieldset = self.context.get("fieldset")
+        if fieldset is not None:
+            for name in set(self.fields) - set(fieldset):
+                self.fields.pop(name)
+
+    @classmethod
+    def select_fields(cls, params: Any) -> Optional[list[str]]:
+        """Имена полей по ?fields= / ?omit=, None - если параметров нет"""
+
+        requested, omitted = _split(params.get("fields")), _split(params.get("omit"))
+        if not requested and not omitted:
+            return None
+
+        available = list(cls.Meta.fields)
+        errors = {
+            param: [f"Unknown field(s): {', '.join(unknown)}"]
+            for param, names in (("fields", requested), ("omit", omitted))
+            if (unknown := sorted(set(names) - set(available)))
+        }
+        if errors:
+            raise ValidationError(errors)
+
+        return [
+            name
+            for name in available
+            if (not requested or name in requested) and name not in omitted
+        ]
+
+    @classmethod
+    def restrict_queryset(
+        cls,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        fieldset: Iterable[str],  # noqa: IND101
+        extra_columns: Iterable[str] = (),  # noqa: IND101
+    ) -> QuerySet:
+        sparse_columns = getattr(cls.Meta, "sparse_columns", {})
+        columns = {"pk", *extra_columns}
+        for name in fieldset:
+            columns.update(sparse_columns.get(name, (name,)))
+
+        relations = {column.rsplit("__", 1)[0] for column in columns if "__" in column}
+        # select_related по отложенной связи Django не допускает
+        return (
+            queryset.select_related(None)
+            .select_related(*sorted(relations))
+            .only(*sorted(columns))
+        )
+
+
+class SparseFieldsetMixin:
+    """Для list-представлений с SparseFieldsetSerializerMixin-сериализатором"""
+
+    def get_fieldset(self) -> Optional[list[str]]:
+        if not hasattr(self, "_fieldset"):
+            serializer_class = self.get_serializer_class()
+            self._fieldset = (
+                serializer_class.select_fields(self.request.query_params)
+                if self.request.method == "GET"
+                and issubclass(serializer_class, SparseFieldsetSerializerMixin)
+                else None
+            )
+
+        return self._fieldset
+
+    def fieldset_includes(self, name: str) -> bool:
+        fieldset = self.get_fieldset()
+        return fieldset is None or name in fieldset
+
+    def get_serializer_context(self) -> dict[str, Any]:
+        context = super().get_serializer_context()
+        context["fieldset"] = self.get_fieldset()
+        return context
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)
+        fieldset = self.get_fieldset()
+        if fieldset is None:
+            return queryset
+
+        # Поля сортировки нужны пагинации (курсор) даже вне набора
+        ordering = [
+            name.lstrip("-")
+            for name in queryset.query.order_by
+            if isinstance(name, str)
+        ]
+        return self.get_serializer_class().restrict_queryset(
+            queryset,
+            fieldset,
+            ordering,
+        )
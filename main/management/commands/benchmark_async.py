@@ -0,0 +1,73 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from main.benchmark import benchmark_async, isolated_environment, seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает синхронные и async-варианты read-эндпоинтов под "
+        "конкурентной нагрузкой через ASGI-стек (транзакция откатывается)"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=5,
+            help="Корневых комментариев на пост",
+        )
+        parser.add_argument("--replies", type=int, default=2)
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Запросов на эндпоинт в каждом режиме",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=20,
+            help="Одновременных запросов",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if min(options["posts"], options["requests"], options["concurrency"]) < 1:
+            raise CommandError(
+                "--posts, --requests and --concurrency must be positive",
+            )
+
+        with isolated_environment(), transaction.atomic():
+            dataset = seed_data(
+                users=20,
+                categories=5,
+                posts=options["posts"],
+                comments=options["comments"],
+                replies=options["replies"],
+                depth=options["depth"],
+                seed=options["seed"],
+            )
+            results = benchmark_async(
+                dataset,
+                options["requests"],
+                options["concurrency"],
+            )
+            transaction.set_rollback(True)
+
+        self.stdout.write(
+            json.dumps(
+                {
+                    "dataset": dataset.summary(),
+                    "requests": options["requests"],
+                    "concurrency": options["concurrency"],
+                    "results": results,
+                },
+                indent=2,
+            ),
+        )
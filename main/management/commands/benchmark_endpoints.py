@@ -0,0 +1,82 @@
+import json
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from main.benchmark import (
+    find_regressions,
+    isolated_environment,
+    run_benchmark,
+    seed_data,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет число запросов, время и размер ответа горячих эндпоинтов "
+        "на сгенерированных данных (транзакция откатывается), отчет в JSON"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=10)
+        parser.add_argument("--posts", type=int, default=500)
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=5,
+            help="Корневых комментариев на пост",
+        )
+        parser.add_argument(
+            "--replies",
+            type=int,
+            default=2,
+            help="Ответов на каждый комментарий следующего уровня",
+        )
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Повторных (warm) запросов на эндпоинт",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Файл отчета (по умолчанию stdout)")
+        parser.add_argument(
+            "--baseline",
+            help="Отчет предыдущего запуска: рост числа запросов - ошибка",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if min(options["users"], options["posts"], options["depth"]) < 1:
+            raise CommandError("--users, --posts and --depth must be positive")
+
+        with isolated_environment(), transaction.atomic():
+            dataset = seed_data(
+                users=options["users"],
+                categories=options["categories"],
+                posts=options["posts"],
+                comments=options["comments"],
+                replies=options["replies"],
+                depth=options["depth"],
+                seed=options["seed"],
+            )
+            report = run_benchmark(dataset, options["repeat"])
+            transaction.set_rollback(True)
+
+        rendered = json.dumps(report, indent=2)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as file:
+                file.write(rendered + "\n")
+        else:
+            self.stdout.write(rendered)
+
+        if options["baseline"]:
+            with open(options["baseline"], encoding="utf-8") as file:
+                regressions = find_regressions(report, json.load(file))
+
+            if regressions:
+                raise CommandError(
+                    "Query count regressions:\n" + "\n".join(regressions),
+                )
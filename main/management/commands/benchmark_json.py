@@ -0,0 +1,63 @@
+import json
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+
+from main.benchmark import (
+    benchmark_json,
+    isolated_environment,
+    json_payloads,
+    seed_data,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает JSON-рендерер/парсер stdlib и orjson на странице постов "
+        "и дереве комментариев (данные генерируются, транзакция откатывается)"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument(
+            "--comments",
+            type=int,
+            default=10,
+            help="Корневых комментариев на пост",
+        )
+        parser.add_argument("--replies", type=int, default=3)
+        parser.add_argument("--depth", type=int, default=3)
+        parser.add_argument("--repeat", type=int, default=50)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        with isolated_environment(), transaction.atomic():
+            dataset = seed_data(
+                users=20,
+                categories=5,
+                posts=options["posts"],
+                comments=options["comments"],
+                replies=options["replies"],
+                depth=options["depth"],
+                seed=options["seed"],
+            )
+            payloads = json_payloads(dataset)
+            transaction.set_rollback(True)
+
+        try:
+            results = benchmark_json(payloads, options["repeat"])
+        except ImproperlyConfigured as exc:
+            raise CommandError(str(exc))
+
+        self.stdout.write(
+            json.dumps(
+                {
+                    "dataset": dataset.summary(),
+                    "repeat": options["repeat"],
+                    "results": results,
+                },
+                indent=2,
+            ),
+        )
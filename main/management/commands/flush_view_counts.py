@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from main.view_counter import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = "Сбрасывает общий буфер просмотров (RedisViewCountStore) в БД, для cron"
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        flushed = flush_view_counts()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {flushed} views"))
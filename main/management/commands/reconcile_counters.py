@@ -0,0 +1,88 @@
+from typing import Any, Iterator
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import models, transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from accounts.models import User
+from comments.models import Comment
+from main.models import Post
+
+
+def count_of(queryset: models.QuerySet, field: str) -> Coalesce:
+    """Коррелированный COUNT(*) по queryset.filter(field=OuterRef("pk"))"""
+
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef("pk")})
+            .order_by()
+            .values(field)
+            .annotate(total=Count("pk"))
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает денормализованные счетчики пачками "
+        "(Post.comments_count, статистика авторов в User)"
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Количество строк, пересчитываемых в одной транзакции",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        active_comments = Comment.objects.filter(is_active=True)
+        counters: list[tuple[type[models.Model], dict[str, Coalesce]]] = [
+            (Post, {"comments_count": count_of(active_comments, "post")}),
+            (
+                User,
+                {
+                    "posts_count": count_of(Post.objects.all(), "author"),
+                    "published_posts_count": count_of(
+                        Post.objects.filter(status="published"),
+                        "author",
+                    ),
+                    "comments_count": count_of(active_comments, "author"),
+                },
+            ),
+        ]
+
+        for model, fields in counters:
+            fixed = 0
+            for first_pk, last_pk in self._pk_ranges(model, options["chunk_size"]):
+                with transaction.atomic():
+                    fixed += model.objects.filter(
+                        pk__gte=first_pk,
+                        pk__lte=last_pk,
+                    ).update(**fields)
+
+            name = model._meta.verbose_name_plural
+            self.stdout.write(self.style.SUCCESS(f"Reconciled {fixed} {name}"))
+
+    def _pk_ranges(
+        self,  # noqa: IND101
+        model: type[models.Model],  # noqa: IND101
+        chunk_size: int,  # noqa: IND101
+    ) -> Iterator[tuple[int, int]]:
+        last_pk = 0
+        while True:
+            pks = list(
+                model.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:chunk_size],
+            )
+            if not pks:
+                return
+
+            yield pks[0], pks[-1]
+            last_pk = pks[-1]
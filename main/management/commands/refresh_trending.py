@@ -0,0 +1,24 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from main.trending import refresh_trending_scores
+from main.view_counter import flush_view_counts
+
+
+class Command(BaseCommand):
+    help = "Обновляет рейтинг trending по новым просмотрам и комментариям, для cron"
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Количество постов, сохраняемых одним bulk_update",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        # Просмотры из буфера должны попасть в этот расчет
+        flush_view_counts()
+        updated = refresh_trending_scores(options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {updated} posts"))
@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-18 14:48
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comments_count(apps, schema_editor):
+    Post = apps.get_model("main", "Post")
+    Comment = apps.get_model("comments", "Comment")
+    active_comments = (
+        Comment.objects.filter(post=OuterRef("pk"), is_active=True)
+        .order_by()
+        .values("post")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Post.objects.update(
+        comments_count=Coalesce(
+            Subquery(active_comments, output_field=IntegerField()),
+            0,
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0002_alter_post_options_and_more"),
+        ("comments", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="comments_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_comments_count, migrations.RunPython.noop),
+    ]
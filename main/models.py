@@ -1,10 +1,46 @@
-from typing import Any
+from typing import Any, Optional
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest, Substr
 from django.urls import reverse
 from django.utils.text import slugify
 
 
+class CategoryQuerySet(models.QuerySet):
+    def with_posts_count(self) -> "CategoryQuerySet":
+        return self.annotate(
+            posts_count=Count("posts", filter=Q(posts__status="published")),
+        )
+
+
+EXCERPT_LENGTH = 200
+
+# Пути коллекций в main/urls.py стоят перед <slug:slug>/ и перекрыли бы пост
+RESERVED_POST_SLUGS = frozenset(
+    {"categories", "my-posts", "popular", "recent", "trending", "export", "bulk"},
+)
+
+
+def post_slug(title: str) -> str:
+    """Слаг поста из заголовка, не совпадающий с путями коллекций"""
+
+    slug = slugify(title)
+    if slug in RESERVED_POST_SLUGS:
+        slug = f"{slug}-post"
+
+    return slug
+
+
+class PostQuerySet(models.QuerySet):
+    def with_excerpt(self, length: int = EXCERPT_LENGTH) -> "PostQuerySet":
+        """content_excerpt - первые length + 1 символов, content не загружается"""
+
+        return self.annotate(
+            content_excerpt=Substr("content", 1, length + 1),
+        ).defer("content")
+
+
 class Category(models.Model):
     class Meta:
         db_table = "categories"
@@ -17,6 +53,8 @@ class Category(models.Model):
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CategoryQuerySet.as_manager()
+
     def __str__(self) -> str:
         return self.name
 
@@ -38,6 +76,8 @@ class Post(models.Model):
             models.Index(fields=["status", "-created_at"]),
             models.Index(fields=["category", "-created_at"]),
             models.Index(fields=["author", "-created_at"]),
+            models.Index(fields=["status", "-trending_score"]),
+            models.Index(fields=["category", "-trending_score"]),
         ]
 
     STATUS_CHOICES = [("draft", "Draft"), ("published", "Published")]
@@ -46,6 +86,8 @@ class Post(models.Model):
     slug = models.SlugField(max_length=200, unique=True, blank=True)
     content = models.TextField()
     image = models.ImageField(upload_to="post/", blank=True, null=True)
+    # Уменьшенные копии image (app_sheep.image_variants)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(
         max_length=10,
         choices=STATUS_CHOICES,
@@ -54,6 +96,11 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+    # Логарифм затухающего рейтинга (main.trending), обновляется периодически
+    trending_score = models.FloatField(null=True, blank=True, editable=False)
+    trending_views_seen = models.PositiveIntegerField(default=0, editable=False)
+    trending_comments_seen = models.PositiveIntegerField(default=0, editable=False)
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -67,22 +114,60 @@ class Post(models.Model):
         related_name="posts",
     )
 
+    objects = PostQuerySet.as_manager()
+
+    # (status, category_id, author_id) на момент загрузки из БД, None для новых
+    _loaded_state: Optional[tuple[str, Optional[int], int]] = None
+
     def __str__(self) -> str:
         return self.title
 
+    @classmethod
+    def from_db(cls, db: Any, field_names: Any, values: Any) -> "Post":
+        instance = super().from_db(db, field_names, values)
+        if {"status", "category_id", "author_id"} <= instance.__dict__.keys():
+            instance._loaded_state = instance.tracked_state
+
+        return instance
+
     def save(self, *args: Any, **kwargs: Any) -> None:
         if not self.slug:
-            self.slug = slugify(self.title)
+            self.slug = post_slug(self.title)
 
-        super().save(*args, **kwargs)
+        # Счетчики автора обновляются в post_save - в той же транзакции
+        with transaction.atomic():
+            if self._loaded_state is None and self.pk is not None:
+                # Загружен через only()/defer() или собран вручную с pk
+                self._loaded_state = (
+                    Post.objects.filter(pk=self.pk)
+                    .values_list("status", "category_id", "author_id")
+                    .first()
+                )
+
+            super().save(*args, **kwargs)
+
+        self._loaded_state = self.tracked_state
 
     @property
-    def comments_count(self) -> str:
-        return self.comments.filter(is_active=True).count()
+    def tracked_state(self) -> tuple[str, Optional[int], int]:
+        return (self.status, self.category_id, self.author_id)
 
     def get_absolute_url(self) -> str:
         return reverse("post-detail", kwargs={"slug": self.slug})
 
+    @classmethod
+    def adjust_comments_count(cls, deltas: dict[int, int]) -> None:
+        """Атомарно сдвигает счетчики комментариев: {post_id: delta}"""
+
+        for post_id, delta in deltas.items():
+            if delta:
+                cls.objects.filter(pk=post_id).update(
+                    comments_count=Greatest(F("comments_count") + delta, 0),
+                )
+
     def increment_views(self) -> None:
-        self.views_count += 1
-        self.save(update_fields=["views_count"])
+        """Учитывает просмотр через буфер счетчика (main.view_counter)"""
+
+        from .view_counter import record_view
+
+        record_view(self.pk)
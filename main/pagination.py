@@ -0,0 +1,274 @@
+"""
+Пагинация лент постов и комментариев.
+
+По умолчанию - обычная постраничная (PageNumberPagination). Клиент включает
+keyset-режим параметром ?cursor= (пустое значение - первая страница): страницы
+выбираются условием по (поле сортировки, id) без COUNT(*) и OFFSET, поэтому
+стоимость страницы не зависит от глубины прокрутки.
+
+Для асинхронных представлений обе пагинации умеют apaginate_queryset.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any, Optional
+from urllib import parse
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    ordering = "-created_at"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> list[Any]:
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page(list(queryset[: self.page_size + 1]))
+
+    async def apaginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> list[Any]:
+        queryset = self.get_page_queryset(queryset, request, view)
+        return self.set_page([obj async for obj in queryset[: self.page_size + 1]])
+
+    def get_page_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> QuerySet:
+        """Запрос страницы (на одну строку больше), без обращения к БД"""
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering_field = self.get_ordering(request, queryset, view)
+        self.field_name = self.ordering_field.lstrip("-")
+        descending = self.ordering_field.startswith("-")
+        self.model_field = queryset.model._meta.get_field(self.field_name)
+
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor["r"]
+        # При движении назад идем по индексу в обратную сторону
+        scan_descending = descending != reverse
+        prefix = "-" if scan_descending else ""
+        queryset = queryset.order_by(f"{prefix}{self.field_name}", f"{prefix}pk")
+
+        if self.cursor:
+            lookup = "lt" if scan_descending else "gt"
+            queryset = queryset.filter(
+                Q(**{f"{self.field_name}__{lookup}": self.cursor["v"]})
+                | Q(
+                    **{
+                        self.field_name: self.cursor["v"],
+                        f"pk__{lookup}": self.cursor["id"],
+                    },
+                ),
+            )
+
+        return queryset
+
+    def set_page(self, results: list[Any]) -> list[Any]:
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+
+        if self.cursor is not None and self.cursor["r"]:
+            results.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        self.page = results
+        return results
+
+    def get_ordering(
+        self,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        view: Optional[APIView],  # noqa: IND101
+    ) -> str:
+        # Учитываем ?ordering=, разрешенный ordering_fields представления
+        for backend in getattr(view, "filter_backends", []):
+            if issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                if ordering:
+                    return ordering[0]
+
+        return self.ordering
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            },
+        )
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self) -> Optional[str]:
+        if not (self.has_next and self.page):
+            return None
+
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+
+        if not self.page:
+            return replace_query_param(self.base_url, self.cursor_query_param, "")
+
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance: Any, reverse: bool) -> str:
+        value = self.model_field.value_to_string(instance)
+        payload = json.dumps({"v": value, "id": instance.pk, "r": int(reverse)})
+        encoded = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request: Request) -> Optional[dict[str, Any]]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(parse.unquote(encoded)))
+            return {
+                "v": self.model_field.to_python(cursor["v"]),
+                "id": int(cursor["id"]),
+                "r": bool(cursor["r"]),
+            }
+        except (binascii.Error, ValueError, TypeError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class FeedPageNumberPagination(PageNumberPagination):
+    """
+    COUNT не повторяется, если представление уже посчитало строки выборки
+    валидатором коллекции (view.validator_total, main.conditional)
+    """
+
+    def paginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> Optional[list[Any]]:
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        total = getattr(view, "validator_total", None)
+        if total is not None:
+            # Paginator.count - cached_property
+            paginator.count = total
+
+        self.set_page(paginator, request)
+        return list(self.page)
+
+    async def apaginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> Optional[list[Any]]:
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count - cached_property: считаем заранее через acount()
+        total = getattr(view, "validator_total", None)
+        paginator.count = await queryset.acount() if total is None else total
+        self.set_page(paginator, request)
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        return list(self.page)
+
+    def set_page(self, paginator: Any, request: Request) -> None:
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(
+                self.invalid_page_message.format(
+                    page_number=page_number,
+                    message=str(exc),
+                ),
+            )
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+
+
+class FeedPagination(BasePagination):
+    """Постраничная пагинация с opt-in keyset-режимом по ?cursor="""
+
+    page_number_class = FeedPageNumberPagination
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> Optional[list[Any]]:
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(
+        self,  # noqa: IND101
+        queryset: QuerySet,  # noqa: IND101
+        request: Request,  # noqa: IND101
+        view: Optional[APIView] = None,  # noqa: IND101
+    ) -> Optional[list[Any]]:
+        self.paginator = self.get_paginator(request)
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginator(self, request: Request) -> Any:
+        if self.keyset_class.cursor_query_param in request.query_params:
+            return self.keyset_class()
+
+        return self.page_number_class()
+
+    def get_paginated_response(self, data: Any) -> Response:
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return self.page_number_class().get_paginated_response_schema(schema)
+
+    def to_html(self) -> str:
+        return self.paginator.to_html()
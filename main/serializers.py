@@ -1,19 +1,27 @@
 from typing import Any, Optional
 from rest_framework import serializers
 from django.utils.text import slugify
-from .models import Category, Post
+from app_sheep.image_variants import variant_urls
+from .fieldsets import SparseFieldsetSerializerMixin
+from .models import EXCERPT_LENGTH, Category, Post, post_slug
+from .summaries import SummaryField, SummaryListSerializer
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
 
     class Meta:
         model = Category
         fields = ["id", "name", "slug", "description", "posts_count", "created_at"]
         read_only_fields = ["slug", "created_at"]
+        sparse_columns = {"posts_count": ()}
 
     posts_count = serializers.SerializerMethodField()
 
     def get_posts_count(self, obj: Any) -> int:
+        # Значение из Category.objects.with_posts_count(), запрос - только без него
+        if hasattr(obj, "posts_count"):
+            return obj.posts_count
+
         return obj.posts.filter(status="published").count()
 
     def create(self, validated_data: dict[str, Any]) -> Any:
@@ -21,7 +29,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class PostListSerializer(serializers.ModelSerializer):
+class PostListSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = [
@@ -30,6 +38,7 @@ class PostListSerializer(serializers.ModelSerializer):
             "slug",
             "content",
             "image",
+            "image_variants",
             "category",
             "author",
             "status",
@@ -38,18 +47,32 @@ class PostListSerializer(serializers.ModelSerializer):
             "views_count",
             "comments_count",
         ]
-        read_only_fields = ["slug", "author", "views_count"]
+        read_only_fields = ["slug", "author", "views_count", "comments_count"]
+        sparse_columns = {
+            "content": (),  # content_excerpt из Post.objects.with_excerpt()
+            "image_variants": ("image", "image_variants"),
+            "category": ("category__name",),
+            "author": ("author__email",),
+        }
 
+    content = serializers.SerializerMethodField()
     author = serializers.StringRelatedField()
     category = serializers.StringRelatedField()
-    comments_count = serializers.ReadOnlyField()
+    image_variants = serializers.SerializerMethodField()
+
+    def get_content(self, obj: Any) -> str:
+        # Без аннотации полный текст грузится из БД и обрезается здесь
+        excerpt = getattr(obj, "content_excerpt", None)
+        if excerpt is None:
+            excerpt = obj.content[: EXCERPT_LENGTH + 1]
+
+        if len(excerpt) > EXCERPT_LENGTH:
+            return excerpt[:EXCERPT_LENGTH] + "..."
 
-    def to_representation(self, instance: Any) -> dict[str, Any]:
-        data = super().to_representation(instance)
-        if len(data["content"]) > 200:
-            data["content"] = data["content"][:200] + "..."
+        return excerpt
 
-        return data
+    def get_image_variants(self, obj: Any) -> Optional[dict[str, Optional[str]]]:
+        return variant_urls(obj.image, obj.image_variants, self.context.get("request"))
 
 
 class PostDetailSerializer(serializers.ModelSerializer):
@@ -62,6 +85,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "slug",
             "content",
             "image",
+            "image_variants",
             "category",
             "category_info",
             "author",
@@ -72,30 +96,15 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "views_count",
             "comments_count",
         ]
-        read_only_fields = ["slug", "author", "views_count"]
-
-    author_info = serializers.SerializerMethodField()
-    category_info = serializers.SerializerMethodField()
-    comments_count = serializers.ReadOnlyField()
-
-    def get_author_info(self, obj: Any) -> dict[str, Any]:
-        author = obj.author
-        return {
-            "id": author.id,
-            "username": author.username,
-            "full_name": author.full_name,
-            "avatar": author.avatar.url if author.avatar else None,
-        }
+        read_only_fields = ["slug", "author", "views_count", "comments_count"]
+        list_serializer_class = SummaryListSerializer
 
-    def get_category_info(self, obj: Any) -> Optional[dict[str, Any]]:
-        if obj.category:
-            return {
-                "id": obj.category.id,
-                "name": obj.category.name,
-                "slug": obj.category.slug,
-            }
+    author_info = SummaryField("author")
+    category_info = SummaryField("category")
+    image_variants = serializers.SerializerMethodField()
 
-        return None
+    def get_image_variants(self, obj: Any) -> Optional[dict[str, Optional[str]]]:
+        return variant_urls(obj.image, obj.image_variants, self.context.get("request"))
 
 
 class PostCreateUpdateSerializer(serializers.ModelSerializer):
@@ -105,11 +114,21 @@ class PostCreateUpdateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data: dict[str, Any]) -> Any:
         validated_data["author"] = self.context["request"].user
-        validated_data["slug"] = slugify(validated_data["title"])
+        validated_data["slug"] = post_slug(validated_data["title"])
         return super().create(validated_data)
 
     def update(self, instance: Any, validated_data: dict[str, Any]) -> Any:
         if "title" in validated_data:
-            validated_data["slug"] = slugify(validated_data["title"])
+            validated_data["slug"] = post_slug(validated_data["title"])
 
         return super().update(instance, validated_data)
+
+
+class PostBulkItemSerializer(serializers.Serializer):
+    """Элемент пакетной записи: связи - голые id, проверяются пакетно во view"""
+
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=200)
+    content = serializers.CharField()
+    category = serializers.IntegerField(required=False, allow_null=True)
+    status = serializers.ChoiceField(choices=Post.STATUS_CHOICES, required=False)
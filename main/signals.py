@@ -0,0 +1,118 @@
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from app_sheep.image_variants import schedule_variants, variants_ready
+
+from .categories import invalidate_category_directory
+from .feed_cache import (
+    POPULAR_FEED,
+    RECENT_FEED,
+    TRENDING_FEED,
+    category_feed,
+    invalidate_feeds,
+    invalidate_post_feeds,
+    trending_feed,
+)
+from .models import Category, Post
+from .summaries import invalidate_summaries
+
+PostState = Optional[tuple[str, Optional[int], int]]
+
+
+@receiver(post_save, sender=Post)
+def post_saved(
+    sender: type[Post],  # noqa: IND101
+    instance: Post,  # noqa: IND101
+    created: bool,  # noqa: IND101
+    **kwargs: Any,  # noqa: IND101
+) -> None:
+    old_state = None if created else instance._loaded_state
+    old_status, old_category_id, _ = old_state or (None, None, None)
+    if old_state != instance.tracked_state:
+        invalidate_category_directory()
+        sync_author_counters([(old_state, instance.tracked_state)])
+
+    # Черновики в публичные ленты не попадают
+    if "published" in (old_status, instance.status) or (
+        not created and old_state is None
+    ):
+        invalidate_post_feeds({old_category_id, instance.category_id})
+
+    schedule_variants(instance, "image", "image_variants")
+
+
+@receiver(variants_ready, sender=Post)
+def post_image_variants_ready(sender: type[Post], pk: int, **kwargs: Any) -> None:
+    # Ленты со ссылками на изображения поста устарели
+    post = Post.objects.filter(pk=pk, status="published").only("category_id").first()
+    if post is not None:
+        invalidate_post_feeds({post.category_id})
+
+
+@receiver(pre_delete, sender=Post)
+def post_deleting(sender: type[Post], instance: Post, **kwargs: Any) -> None:
+    # После удаления строки отложенные (only()/defer()) поля уже не догрузить
+    deferred = instance.get_deferred_fields() & {"status", "category_id", "author_id"}
+    if deferred:
+        instance.refresh_from_db(using=instance._state.db, fields=deferred)
+
+    if instance._loaded_state is None:
+        instance._loaded_state = instance.tracked_state
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(
+    sender: type[Post],  # noqa: IND101
+    instance: Post,  # noqa: IND101
+    origin: Any = None,  # noqa: IND101
+    **kwargs: Any,  # noqa: IND101
+) -> None:
+    state = instance._loaded_state or instance.tracked_state
+    status, category_id, _ = state
+    invalidate_category_directory()
+    if status == "published":
+        invalidate_post_feeds({category_id})
+
+    # Автор удаляется вместе с постами, его счетчики обновлять незачем
+    if not isinstance(origin, User):
+        sync_author_counters([(state, None)])
+
+
+def sync_author_counters(changes: Iterable[tuple[PostState, PostState]]) -> None:
+    """
+    Переносит вклад постов в User.posts_count/published_posts_count,
+    changes - пары (старое, новое) состояние, None - поста нет
+    """
+
+    posts: Counter[int] = Counter()
+    published: Counter[int] = Counter()
+    for old_state, new_state in changes:
+        for state, sign in [(old_state, -1), (new_state, 1)]:
+            if state is not None:
+                status, _, author_id = state
+                posts[author_id] += sign
+                published[author_id] += sign if status == "published" else 0
+
+    User.adjust_counter("posts_count", posts)
+    User.adjust_counter("published_posts_count", published)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender: type[Category], instance: Category, **kwargs: Any) -> None:
+    invalidate_category_directory()
+    invalidate_summaries(Category, [instance.pk])
+    # Название категории выводится в ленте постов
+    invalidate_feeds(
+        [
+            POPULAR_FEED,
+            RECENT_FEED,
+            TRENDING_FEED,
+            category_feed(instance.slug),
+            trending_feed(instance.slug),
+        ],
+    )
@@ -0,0 +1,171 @@
+"""
+Краткие сводки связанных объектов (автор, категория) для сериализаторов.
+
+Сериализатор объявляет сводку полем SummaryField("author"), а SummaryLoader
+из контекста собирает id всех строк списка и получает недостающие сводки
+разом: из связи, уже загруженной select_related, затем из горячего кеша
+(app_sheep.tiered_cache) и одним запросом на модель для остального. Каждая
+сводка строится один раз на запрос, сколько бы строк ни ссылались на
+одного автора. Сводки не зависят от запроса (ссылки на аватары
+относительные), поэтому кешируются между запросами и сбрасываются
+сигналами при изменении пользователя или категории.
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Optional
+
+from django.db import models, transaction
+from rest_framework import serializers
+
+from accounts.models import User
+from app_sheep.image_variants import variant_url
+from app_sheep.tiered_cache import hot_cache
+
+from .models import Category
+
+SUMMARY_TIMEOUT = 60 * 10
+
+
+@dataclass(frozen=True)
+class Summary:
+    columns: tuple[str, ...]
+    build: Callable[[Any], dict[str, Any]]
+
+
+SUMMARIES: dict[type[models.Model], Summary] = {
+    User: Summary(
+        ("id", "username", "first_name", "last_name", "avatar", "avatar_variants"),
+        lambda user: {
+            "id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "avatar": variant_url(user.avatar, user.avatar_variants, "thumbnail"),
+        },
+    ),
+    Category: Summary(
+        ("id", "name", "slug"),
+        lambda category: {
+            "id": category.id,
+            "name": category.name,
+            "slug": category.slug,
+        },
+    ),
+}
+
+
+def summary_cache_key(model: type[models.Model], pk: Any) -> str:
+    return f"summary:{model._meta.label_lower}:{pk}"
+
+
+def invalidate_summaries(model: type[models.Model], pks: Iterable[Any]) -> None:
+    keys = [summary_cache_key(model, pk) for pk in pks]
+    if keys:
+        transaction.on_commit(lambda: hot_cache.delete_many(keys))
+
+
+class SummaryLoader:
+    """Сводки одного запроса: {модель: {pk: сводка или None}}"""
+
+    def __init__(self) -> None:
+        self.summaries: dict[type[models.Model], dict[Any, Any]] = defaultdict(dict)
+
+    def load(self, instances: Iterable[models.Model], relations: Iterable[str]) -> None:
+        pending: defaultdict[type[models.Model], set[Any]] = defaultdict(set)
+        for instance in instances:
+            for relation in relations:
+                field = instance._meta.get_field(relation)
+                model = field.related_model
+                pk = getattr(instance, field.attname)
+                if pk is None or pk in self.summaries[model]:
+                    continue
+
+                if field.is_cached(instance):
+                    self.summaries[model][pk] = SUMMARIES[model].build(
+                        getattr(instance, relation),
+                    )
+                else:
+                    pending[model].add(pk)
+
+        for model, pks in pending.items():
+            self._fetch(model, pks)
+
+    def get(self, instance: models.Model, relation: str) -> Optional[dict[str, Any]]:
+        field = instance._meta.get_field(relation)
+        pk = getattr(instance, field.attname)
+        if pk is None:
+            return None
+
+        if pk not in self.summaries[field.related_model]:
+            # Объект вне предзагруженного списка (detail, вложенный сериализатор)
+            self.load([instance], [relation])
+
+        return self.summaries[field.related_model][pk]
+
+    def _fetch(self, model: type[models.Model], pks: set[Any]) -> None:
+        summary = SUMMARIES[model]
+        keys = {summary_cache_key(model, pk): pk for pk in pks}
+        cached = hot_cache.get_many(keys)
+        for key, value in cached.items():
+            self.summaries[model][keys[key]] = value
+
+        missing = pks - {keys[key] for key in cached}
+        if not missing:
+            return
+
+        built = {
+            obj.pk: summary.build(obj)
+            for obj in model._default_manager.filter(pk__in=missing).only(
+                *summary.columns,
+            )
+        }
+        hot_cache.set_many(
+            {summary_cache_key(model, pk): value for pk, value in built.items()},
+            SUMMARY_TIMEOUT,
+        )
+        for pk in missing:
+            self.summaries[model][pk] = built.get(pk)
+
+
+def get_summary_loader(context: dict[str, Any]) -> SummaryLoader:
+    # Контекст общий для вложенных сериализаторов - и загрузчик тоже
+    return context.setdefault("summary_loader", SummaryLoader())
+
+
+class SummaryField(serializers.Field):
+    """Сводка объекта по внешнему ключу relation (см. SUMMARIES)"""
+
+    def __init__(self, relation: str, **kwargs: Any) -> None:
+        self.relation = relation
+        kwargs["source"] = "*"
+        kwargs["read_only"] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance: models.Model) -> Optional[dict[str, Any]]:
+        return get_summary_loader(self.context).get(instance, self.relation)
+
+
+class SummaryListSerializer(serializers.ListSerializer):
+    """
+    Meta.list_serializer_class сериализатора с полями SummaryField: перед
+    сериализацией списка загружает сводки всех его строк разом. Метод
+    get_summary_instances(instances) дочернего сериализатора может добавить
+    вложенные объекты (например, ответы в дереве комментариев).
+    """
+
+    def to_representation(self, data: Any) -> list[Any]:
+        iterable = data.all() if isinstance(data, models.manager.BaseManager) else data
+        instances = list(iterable)
+        relations = [
+            field.relation
+            for field in self.child.fields.values()
+            if isinstance(field, SummaryField)
+        ]
+        if relations:
+            get_instances = getattr(self.child, "get_summary_instances", None)
+            get_summary_loader(self.context).load(
+                get_instances(instances) if get_instances else instances,
+                relations,
+            )
+
+        return super().to_representation(instances)
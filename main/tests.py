@@ -1,3 +1,218 @@
-from django.test import TestCase
+from typing import Any
 
-# Create your tests here.
+from django.db import transaction
+from django.test import TestCase, TransactionTestCase
+
+from accounts.models import User
+from app_sheep.tiered_cache import hot_cache
+
+from .benchmark import isolated_environment, run_benchmark, seed_data
+from .models import RESERVED_POST_SLUGS, Category, Post
+
+
+class BenchmarkSmokeTest(TestCase):
+    def test_seed_and_measure_tiny_dataset(self) -> None:
+        with isolated_environment():
+            dataset = seed_data(
+                users=2,
+                categories=0,
+                posts=3,
+                comments=1,
+                replies=1,
+                depth=2,
+            )
+            report = run_benchmark(dataset, repeat=1)
+
+        self.assertEqual(
+            dataset.summary(),
+            {"users": 2, "categories": 0, "posts": 3, "comments": 6},
+        )
+        self.assertTrue(all(post.category_id is None for post in dataset.posts))
+        for result in report["results"]:
+            self.assertEqual(result["status"], 200, result["endpoint"])
+
+
+class AuthorCountersTest(TestCase):
+    def setUp(self) -> None:
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        self.category = Category.objects.create(name="News")
+
+    def create_post(self, **kwargs: object) -> Post:
+        return Post.objects.create(
+            title=kwargs.pop("title", "Post"),
+            content="Content",
+            author=self.author,
+            category=self.category,
+            **kwargs,
+        )
+
+    def assertCounters(self, posts: int, published: int) -> None:
+        self.author.refresh_from_db()
+        self.assertEqual(
+            (self.author.posts_count, self.author.published_posts_count),
+            (posts, published),
+        )
+
+    def test_create_and_change_status(self) -> None:
+        post = self.create_post()
+        self.create_post(title="Draft", status="draft")
+        self.assertCounters(2, 1)
+
+        post.status = "draft"
+        post.save()
+        self.assertCounters(2, 0)
+
+    def test_change_author(self) -> None:
+        other = User.objects.create_user(
+            username="other",
+            email="other@example.com",
+            password="password",
+        )
+        post = self.create_post()
+        post.author = other
+        post.save()
+
+        self.assertCounters(0, 0)
+        other.refresh_from_db()
+        self.assertEqual((other.posts_count, other.published_posts_count), (1, 1))
+
+    def test_save_partially_loaded(self) -> None:
+        post = self.create_post()
+        partial = Post.objects.only("title").get(pk=post.pk)
+        partial.status = "draft"
+        partial.save()
+        self.assertCounters(1, 0)
+
+    def test_delete(self) -> None:
+        post = self.create_post()
+        self.create_post(title="Second")
+        post.delete()
+        self.assertCounters(1, 1)
+
+    def test_delete_partially_loaded(self) -> None:
+        post = self.create_post()
+        Post.objects.only("title").get(pk=post.pk).delete()
+        self.assertCounters(0, 0)
+
+        self.create_post(title="Deferred")
+        Post.objects.defer("status", "author").delete()
+        self.assertCounters(0, 0)
+
+
+class PostSlugTest(TestCase):
+    def test_collection_paths_are_not_post_slugs(self) -> None:
+        author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        for title in RESERVED_POST_SLUGS:
+            post = Post.objects.create(title=title, content="Content", author=author)
+            response = self.client.get(post.get_absolute_url())
+            self.assertEqual(response.status_code, 200, title)
+            self.assertEqual(response.json()["title"], title)
+
+
+class FeedCacheInvalidationTest(TransactionTestCase):
+    """Сброс идет в on_commit - нужны настоящие коммиты"""
+
+    def setUp(self) -> None:
+        hot_cache.clear()
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        self.news = Category.objects.create(name="News")
+        self.other = Category.objects.create(name="Other")
+
+    def create_post(self, title: str, **kwargs: Any) -> Post:
+        kwargs.setdefault("category", self.news)
+        return Post.objects.create(
+            title=title,
+            content="Content",
+            author=self.author,
+            **kwargs,
+        )
+
+    def recent_titles(self) -> list[str]:
+        return [
+            post["title"] for post in self.client.get("/api/v1/posts/recent/").json()
+        ]
+
+    def category_titles(self, category: Category) -> list[str]:
+        response = self.client.get(f"/api/v1/posts/categories/{category.slug}/posts/")
+        return [post["title"] for post in response.json()["posts"]]
+
+    def directory(self) -> dict[str, int]:
+        results = self.client.get("/api/v1/posts/categories/").json()["results"]
+        return {category["name"]: category["posts_count"] for category in results}
+
+    def test_feeds_follow_post_changes(self) -> None:
+        first = self.create_post("First")
+        self.assertEqual(self.recent_titles(), ["First"])
+
+        # update() не отправляет сигналов: лента отдается из кеша
+        Post.objects.filter(pk=first.pk).update(title="Silent")
+        self.assertEqual(self.recent_titles(), ["First"])
+
+        second = self.create_post("Second")
+        self.assertEqual(self.recent_titles(), ["Second", "Silent"])
+
+        second.status = "draft"
+        second.save()
+        self.assertEqual(self.recent_titles(), ["Silent"])
+
+        Post.objects.only("title").get(pk=first.pk).delete()
+        self.assertEqual(self.recent_titles(), [])
+
+    def test_category_feeds_follow_moves(self) -> None:
+        post = self.create_post("Moved")
+        self.assertEqual(self.category_titles(self.news), ["Moved"])
+        self.assertEqual(self.category_titles(self.other), [])
+
+        post.category = self.other
+        post.save()
+        self.assertEqual(self.category_titles(self.news), [])
+        self.assertEqual(self.category_titles(self.other), ["Moved"])
+
+    def test_category_directory(self) -> None:
+        self.assertEqual(self.directory(), {"News": 0, "Other": 0})
+
+        post = self.create_post("Counted")
+        self.create_post("Draft", status="draft")
+        self.assertEqual(self.directory(), {"News": 1, "Other": 0})
+
+        post.category = self.other
+        post.save()
+        self.assertEqual(self.directory(), {"News": 0, "Other": 1})
+
+        self.news.name = "World"
+        self.news.save()
+        self.assertEqual(self.directory(), {"Other": 1, "World": 0})
+
+        post.delete()
+        self.assertEqual(self.directory(), {"Other": 0, "World": 0})
+
+    def test_rolled_back_change_keeps_cache(self) -> None:
+        self.assertEqual(self.directory(), {"News": 0, "Other": 0})
+        self.assertEqual(self.recent_titles(), [])
+
+        with transaction.atomic():
+            self.create_post("Rolled back")
+            transaction.set_rollback(True)
+
+        # bulk_create без сигналов: если бы откат сбросил кеш, пост был бы виден
+        Post.objects.bulk_create(
+            [
+                Post(
+                    title="Silent", slug="silent", content="Content", author=self.author
+                )
+            ],
+        )
+        self.assertEqual(self.recent_titles(), [])
+        self.assertEqual(self.directory(), {"News": 0, "Other": 0})
@@ -0,0 +1,128 @@
+"""
+Рейтинг "в тренде" с затуханием по времени.
+
+Каждое событие (публикация, просмотр, комментарий) весит w * 2^((t - T0) / H),
+где H - период полураспада. Все вклады растут с одной скоростью, поэтому
+сортировка по сумме совпадает с сортировкой по затухающему рейтингу на любой
+момент, и пересчитывать старые посты не нужно. В trending_score хранится
+натуральный логарифм суммы, чтобы числа не переполнялись.
+
+Периодическая задача (refresh_trending) добавляет вклад только тех постов,
+у которых с прошлого запуска изменились views_count или comments_count.
+"""
+
+import math
+from datetime import datetime, timezone as dt_timezone
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .feed_cache import invalidate_post_feeds
+from .models import Post
+
+EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+DEFAULTS: dict[str, Any] = {
+    "HALF_LIFE_HOURS": 12,
+    "PUBLISH_WEIGHT": 10.0,
+    "VIEW_WEIGHT": 1.0,
+    "COMMENT_WEIGHT": 5.0,
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "TRENDING", {}).get(name, DEFAULTS[name])
+
+
+def event_log_weight(weight: float, at: datetime) -> float:
+    """log(weight * 2^((at - EPOCH) / half_life))"""
+
+    half_life = get_setting("HALF_LIFE_HOURS") * 3600
+    age = (at - EPOCH).total_seconds()
+    return math.log(weight) + age / half_life * math.log(2)
+
+
+def add_log_scores(
+    score: Optional[float],  # noqa: IND101
+    addition: Optional[float],  # noqa: IND101
+) -> Optional[float]:
+    if score is None:
+        return addition
+
+    if addition is None:
+        return score
+
+    high, low = max(score, addition), min(score, addition)
+    return high + math.log1p(math.exp(low - high))
+
+
+def refresh_trending_scores(chunk_size: int = 1000) -> int:
+    """
+    Добавляет вклад новых событий и сбрасывает затронутые ленты,
+    возвращает число обновленных постов.
+    """
+
+    now = timezone.now()
+    stale = (
+        Post.objects.filter(status="published")
+        .filter(
+            Q(trending_score__isnull=True)
+            | ~Q(views_count=F("trending_views_seen"))
+            | ~Q(comments_count=F("trending_comments_seen")),
+        )
+        .only(
+            "pk",
+            "category_id",
+            "created_at",
+            "views_count",
+            "comments_count",
+            "trending_score",
+            "trending_views_seen",
+            "trending_comments_seen",
+        )
+        .order_by("pk")
+    )
+
+    batch: list[Post] = []
+    categories: set[Optional[int]] = set()
+    updated = 0
+    for post in stale.iterator(chunk_size=chunk_size):
+        if post.trending_score is None:
+            # Первый расчет: только публикация, накопленная история не считается
+            score = event_log_weight(get_setting("PUBLISH_WEIGHT"), post.created_at)
+        else:
+            weight = get_setting("VIEW_WEIGHT") * max(
+                post.views_count - post.trending_views_seen,
+                0,
+            ) + get_setting("COMMENT_WEIGHT") * max(
+                post.comments_count - post.trending_comments_seen,
+                0,
+            )
+            score = add_log_scores(
+                post.trending_score,
+                event_log_weight(weight, now) if weight > 0 else None,
+            )
+
+        post.trending_score = score
+        post.trending_views_seen = post.views_count
+        post.trending_comments_seen = post.comments_count
+        batch.append(post)
+        categories.add(post.category_id)
+        if len(batch) >= chunk_size:
+            updated += _save_scores(batch)
+            batch = []
+
+    updated += _save_scores(batch)
+    if updated:
+        invalidate_post_feeds(categories)
+
+    return updated
+
+
+def _save_scores(posts: list[Post]) -> int:
+    return Post.objects.bulk_update(
+        posts,
+        ["trending_score", "trending_views_seen", "trending_comments_seen"],
+    )
@@ -13,10 +13,18 @@ urlpatterns = [
         views.post_by_category,
         name="posts-by-category",
     ),
+    path(
+        "categories/<slug:category_slug>/trending/",
+        views.trending_posts,
+        name="trending-posts-by-category",
+    ),
 
     path("", views.PostListCreateView.as_view(), name="post-list"),
     path("my-posts/", views.MyPostsView.as_view(), name="my-posts"),
     path("popular/", views.popular_posts, name="popular-posts"),
     path("recent/", views.recent_posts, name="recent-posts"),
+    path("trending/", views.trending_posts, name="trending-posts"),
+    path("export/", views.PostExportView.as_view(), name="post-export"),
+    path("bulk/", views.PostBulkView.as_view(), name="post-bulk"),
     path("<slug:slug>/", views.PostDetailView.as_view(), name="post-detail"),
 ]
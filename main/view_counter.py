@@ -0,0 +1,201 @@
+"""
+Буферизированный счетчик просмотров постов.
+
+Просмотры копятся в хранилище (память процесса или Redis) и периодически
+сбрасываются в БД одним UPDATE ... SET views_count = views_count + n на пачку
+постов, вместо записи в строку поста на каждый GET.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from functools import partial
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS: dict[str, Any] = {
+    "BACKEND": "main.view_counter.LocalMemoryViewCountStore",
+    "FLUSH_INTERVAL": 10,
+    "FLUSH_THRESHOLD": 500,
+    "BATCH_SIZE": 500,
+    "REDIS_ALIAS": "default",
+    "KEY_PREFIX": "post_views",
+}
+
+
+def get_setting(name: str) -> Any:
+    return getattr(settings, "VIEW_COUNTER", {}).get(name, DEFAULTS[name])
+
+
+class BaseViewCountStore:
+    def incr(self, post_id: int, amount: int = 1) -> None:
+        raise NotImplementedError
+
+    def drain(self) -> dict[int, int]:
+        """Забирает накопленные приращения и обнуляет буфер"""
+
+        raise NotImplementedError
+
+    def should_flush(self) -> bool:
+        raise NotImplementedError
+
+    def restore(self, counts: dict[int, int]) -> None:
+        for post_id, amount in counts.items():
+            self.incr(post_id, amount)
+
+
+class LocalMemoryViewCountStore(BaseViewCountStore):
+    """Буфер в памяти процесса, сбрасывается по интервалу/порогу и при выходе"""
+
+    def __init__(self) -> None:
+        self._counts: Counter[int] = Counter()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+        atexit.register(flush_view_counts, self)
+
+    def incr(self, post_id: int, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[post_id] += amount
+            self._pending += amount
+
+    def drain(self) -> dict[int, int]:
+        with self._lock:
+            counts = dict(self._counts)
+            self._counts.clear()
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+        return counts
+
+    def should_flush(self) -> bool:
+        if self._pending >= get_setting("FLUSH_THRESHOLD"):
+            return True
+
+        return time.monotonic() - self._last_flush >= get_setting("FLUSH_INTERVAL")
+
+
+class RedisViewCountStore(BaseViewCountStore):
+    """Общий буфер в Redis (hash), один на все процессы"""
+
+    def __init__(self) -> None:
+        from django_redis import get_redis_connection
+        from redis.exceptions import ResponseError
+
+        self._missing_key_error = ResponseError
+        self._redis = get_redis_connection(get_setting("REDIS_ALIAS"))
+        self._key = f"{get_setting('KEY_PREFIX')}:pending"
+        self._lock_key = f"{get_setting('KEY_PREFIX')}:flush_lock"
+
+    def incr(self, post_id: int, amount: int = 1) -> None:
+        self._redis.hincrby(self._key, post_id, amount)
+
+    def drain(self) -> dict[int, int]:
+        # RENAME атомарно отдает текущий буфер, новые просмотры пишутся в новый
+        draining_key = f"{self._key}:draining:{time.time_ns()}"
+        try:
+            self._redis.rename(self._key, draining_key)
+        except self._missing_key_error:  # ключа нет - сбрасывать нечего
+            pass
+
+        # Заодно забираем буферы, брошенные упавшим между RENAME и чтением
+        # процессом; чтение и удаление каждого - одним MULTI/EXEC
+        counts: Counter[int] = Counter()
+        for key in self._redis.scan_iter(match=f"{self._key}:draining:*"):
+            pipe = self._redis.pipeline(transaction=True)
+            pipe.hgetall(key)
+            pipe.delete(key)
+            raw, deleted = pipe.execute()
+            if not deleted:  # другой процесс успел забрать этот буфер
+                continue
+
+            for post_id, amount in raw.items():
+                counts[int(post_id)] += int(amount)
+
+        return dict(counts)
+
+    def should_flush(self) -> bool:
+        # Сбрасывает только один процесс за интервал
+        return bool(
+            self._redis.set(
+                self._lock_key,
+                1,
+                nx=True,
+                ex=max(int(get_setting("FLUSH_INTERVAL")), 1),
+            ),
+        )
+
+
+_store: Optional[BaseViewCountStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> BaseViewCountStore:
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(get_setting("BACKEND"))()
+
+    return _store
+
+
+def record_view(post_id: int) -> None:
+    store = get_store()
+    store.incr(post_id)
+    if store.should_flush():
+        # Сбрасываем после коммита запроса (если он в транзакции), чтобы откат
+        # транзакции запроса не унес уже выгруженный из буфера счетчик
+        transaction.on_commit(partial(_flush_quietly, store))
+
+
+def _flush_quietly(store: BaseViewCountStore) -> None:
+    try:
+        flush_view_counts(store)
+    except Exception:  # noqa: S110 - уже залогировано, счетчики возвращены в буфер
+        pass
+
+
+def flush_view_counts(store: Optional[BaseViewCountStore] = None) -> int:
+    """Записывает буфер в БД, возвращает число учтенных просмотров"""
+
+    from .models import Post
+
+    store = store or get_store()
+    counts = store.drain()
+    if not counts:
+        return 0
+
+    post_ids = sorted(counts)
+    batch_size = get_setting("BATCH_SIZE")
+    try:
+        with transaction.atomic():
+            for start in range(0, len(post_ids), batch_size):
+                end = start + batch_size
+                batch = post_ids[start:end]
+                Post.objects.filter(pk__in=batch).update(
+                    views_count=F("views_count")
+                    + Case(
+                        *[
+                            When(pk=post_id, then=Value(counts[post_id]))
+                            for post_id in batch
+                        ],
+                        default=Value(0),
+                        output_field=IntegerField(),
+                    ),
+                )
+    except Exception:
+        logger.exception("Failed to flush view counts, returning them to the buffer")
+        store.restore(counts)
+        raise
+
+    return sum(counts.values())
@@ -1,25 +1,49 @@
-from typing import Any, Type
+from typing import Any, Optional, Type
 from rest_framework import generics, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.request import Request
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import QuerySet, Q
+from django.db.models import QuerySet, Q, Sum
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Category, Post
+from .models import Category, Post, post_slug
 from .serializers import (
     CategorySerializer,
     PostListSerializer,
     PostDetailSerializer,
     PostCreateUpdateSerializer,
+    PostBulkItemSerializer,
 )
 
+from app_sheep.lean_api import NonAtomicReadsMixin, non_atomic_reads
+
+from .bulk import BulkWriteView, ItemErrors
+from .categories import get_category_directory, invalidate_category_directory
+from .conditional import CollectionConditionalGetMixin, ConditionalGetMixin
+from .export import StreamingExportView
+from .feed_cache import (
+    POPULAR_FEED,
+    RECENT_FEED,
+    cached_feed_response,
+    category_feed,
+    invalidate_post_feeds,
+    trending_feed,
+)
+from .fieldsets import SparseFieldsetMixin
+from .pagination import FeedPagination
 from .permissions import IsAuthorOrReadOnly
+from .signals import sync_author_counters
+from .view_counter import record_view
 
 
-class CategoryListCreateView(generics.ListCreateAPIView):
-    queryset = Category.objects.all()
+class CategoryListCreateView(
+    NonAtomicReadsMixin,
+    SparseFieldsetMixin,
+    generics.ListCreateAPIView,
+):
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -27,15 +51,38 @@ class CategoryListCreateView(generics.ListCreateAPIView):
     ordering_fields = ["name", "created_at"]
     ordering = ["name"]
 
+    def get_queryset(self) -> QuerySet[Category]:
+        if self.fieldset_includes("posts_count"):
+            return Category.objects.with_posts_count()
+
+        return Category.objects.all()
+
+    def list(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        # Без поиска/сортировки отдаем кешированный справочник категорий
+        if request.query_params.keys() - {"page"}:
+            return super().list(request, *args, **kwargs)
+
+        directory = get_category_directory()
+        page = self.paginate_queryset(directory)
+        if page is not None:
+            return self.get_paginated_response(page)
+
+        return Response(directory)
+
 
-class CategoryDetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Category.objects.all()
+class CategoryDetailView(NonAtomicReadsMixin, generics.RetrieveUpdateDestroyAPIView):
+    queryset = Category.objects.with_posts_count()
     serializer_class = CategorySerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     lookup_field = "slug"
 
 
-class PostListCreateView(generics.ListCreateAPIView):
+class PostListCreateView(
+    NonAtomicReadsMixin,
+    SparseFieldsetMixin,
+    CollectionConditionalGetMixin,
+    generics.ListCreateAPIView,
+):
     """
     API endpoint для постов c поддержкой закрепленных постов.
     Закрепленные посты отображаются первыми в порядке закрепления.
@@ -43,6 +90,7 @@ class PostListCreateView(generics.ListCreateAPIView):
 
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = FeedPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -52,11 +100,17 @@ class PostListCreateView(generics.ListCreateAPIView):
     search_fields = ["title", "content"]
     ordering_fields = ["created_at", "updated_at", "views_count", "title"]
     ordering = ["-created_at"]
+    validator_aggregates = {
+        "views": Sum("views_count"),
+        "comments": Sum("comments_count"),
+    }
 
     def get_queryset(self) -> QuerySet["Post"]:
         """Возвращает посты с учетом прав доступа"""
 
         queryset = Post.objects.select_related("author", "category")
+        if self.fieldset_includes("content"):
+            queryset = queryset.with_excerpt()
 
         if not self.request.user.is_authenticated:
             queryset = queryset.filter(status="published")
@@ -74,11 +128,25 @@ class PostListCreateView(generics.ListCreateAPIView):
         return PostListSerializer
 
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(
+    NonAtomicReadsMixin,
+    ConditionalGetMixin,
+    generics.RetrieveUpdateDestroyAPIView,
+):
     queryset = Post.objects.select_related("author", "category")
     serializer_class = PostDetailSerializer
     permission_classes = [IsAuthorOrReadOnly]
     lookup_field = "slug"
+    validator_fields = (
+        "pk",
+        "updated_at",
+        "views_count",
+        "comments_count",
+        "author__updated_at",
+    )
+
+    def not_modified(self, row: dict[str, Any]) -> None:
+        record_view(row["pk"])
 
     def get_serializer_class(self) -> Type[serializers.Serializer]:
         if self.request.method == ["PUT", "PATCH"]:
@@ -93,18 +161,25 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
         **kwargs: Any,  # noqa: IND101
     ) -> Response:
         instance = self.get_object()
-        instance = self.get_object()
 
         if request.method == "GET":
-            instance.increment_views()
+            record_view(instance.pk)
+            # Учитываем текущий просмотр в ответе, в БД он попадет при сбросе буфера
+            instance.views_count += 1
 
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
 
-class MyPostsView(generics.ListAPIView):
+class MyPostsView(
+    NonAtomicReadsMixin,
+    SparseFieldsetMixin,
+    CollectionConditionalGetMixin,
+    generics.ListAPIView,
+):
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = FeedPagination
     filter_backends = [
         DjangoFilterBackend,
         filters.SearchFilter,
@@ -114,53 +189,243 @@ class MyPostsView(generics.ListAPIView):
     search_fields = ["title", "content"]
     ordering_fields = ["created_at", "updated_at", "views_count", "title"]
     ordering = ["-created_at"]
+    validator_aggregates = {
+        "views": Sum("views_count"),
+        "comments": Sum("comments_count"),
+    }
 
     def get_queryset(self) -> QuerySet["Post"]:
-        return Post.objects.filter(author=self.request.user).select_related(
+        queryset = Post.objects.filter(author=self.request.user).select_related(
             "author",
             "category",
         )
+        if self.fieldset_includes("content"):
+            queryset = queryset.with_excerpt()
+
+        return queryset
 
 
+@non_atomic_reads
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
-def post_by_category(request: Request, category_slug: str) -> Response:
-    category = get_object_or_404(Category, slug=category_slug)
-    posts = (
-        Post.objects.filter(
-            category=category,
-            status="published",
+def post_by_category(request: Request, category_slug: str) -> HttpResponse:
+    def build() -> dict[str, Any]:
+        category = get_object_or_404(
+            Category.objects.with_posts_count(),
+            slug=category_slug,
         )
-        .select_related("author", "category")
-        .order_by("-created_at")
-    )
+        posts = (
+            Post.objects.with_excerpt()
+            .filter(
+                category=category,
+                status="published",
+            )
+            .select_related("author", "category")
+            .order_by("-created_at")
+        )
+        serializer = PostListSerializer(posts, many=True, context={"request": request})
+        return {"category": CategorySerializer(category).data, "posts": serializer.data}
 
-    serializer = PostListSerializer(posts, many=True, context={"request": request})
+    return cached_feed_response(category_feed(category_slug), request, build)
 
-    return Response(
-        {"category": CategorySerializer(category).data, "posts": serializer.data},
-    )
+
+@non_atomic_reads
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def popular_posts(request: Request) -> HttpResponse:
+    def build() -> Any:
+        posts = (
+            Post.objects.with_excerpt()
+            .filter(status="published")
+            .select_related("author", "category")
+            .order_by("-views_count")[:10]
+        )
+        return PostListSerializer(posts, many=True, context={"request": request}).data
+
+    # views_count меняется без сигналов (буфер просмотров), поэтому короткий TTL
+    return cached_feed_response(POPULAR_FEED, request, build, timeout=60)
 
 
+@non_atomic_reads
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
-def popular_posts(request: Request) -> Response:
-    posts = (
-        Post.objects.filter(status="published")
-        .select_related("author", "category")
-        .order_by("-views_count")[:10]
-    )
-    serializer = PostListSerializer(posts, many=True, context={"request": request})
-    return Response(serializer.data)
+def trending_posts(
+    request: Request,  # noqa: IND101
+    category_slug: Optional[str] = None,  # noqa: IND101
+) -> HttpResponse:
+    def build() -> Any:
+        posts = Post.objects.with_excerpt().filter(
+            status="published",
+            trending_score__isnull=False,
+        )
+        if category_slug is not None:
+            category = get_object_or_404(Category, slug=category_slug)
+            posts = posts.filter(category=category)
 
+        posts = posts.select_related("author", "category").order_by(
+            "-trending_score",
+        )[:10]
+        return PostListSerializer(posts, many=True, context={"request": request}).data
 
+    # Рейтинг меняется только командой refresh_trending, она и сбрасывает ленту
+    return cached_feed_response(trending_feed(category_slug), request, build)
+
+
+@non_atomic_reads
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
-def recent_posts(request: Request) -> Response:
-    posts = (
-        Post.objects.filter(status="published")
-        .select_related("author", "category")
-        .order_by("-created_at")[:10]
+def recent_posts(request: Request) -> HttpResponse:
+    def build() -> Any:
+        posts = (
+            Post.objects.with_excerpt()
+            .filter(status="published")
+            .select_related("author", "category")
+            .order_by("-created_at")[:10]
+        )
+        return PostListSerializer(posts, many=True, context={"request": request}).data
+
+    return cached_feed_response(RECENT_FEED, request, build)
+
+
+class PostExportView(StreamingExportView):
+    queryset = Post.objects.all()
+    filterset_fields = ["category", "author", "status"]
+    export_name = "posts"
+    export_fields = (
+        "id",
+        "title",
+        "slug",
+        "content",
+        "status",
+        "category_id",
+        "author_id",
+        "views_count",
+        "comments_count",
+        "created_at",
+        "updated_at",
     )
-    serializer = PostListSerializer(posts, many=True, context={"request": request})
-    return Response(serializer.data)
+
+
+class PostBulkView(BulkWriteView):
+    serializer_class = PostBulkItemSerializer
+
+    def perform_bulk_create(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        self._check_categories(items, errors)
+        slugs = {index: post_slug(item["title"]) for index, item in items.items()}
+        taken = set(
+            Post.objects.filter(slug__in=set(slugs.values())).values_list(
+                "slug",
+                flat=True,
+            ),
+        )
+
+        posts = {}
+        for index, item in items.items():
+            if index in errors:
+                continue
+
+            if slugs[index] in taken:
+                errors[index] = {"title": ["Post with this slug already exists."]}
+                continue
+
+            taken.add(slugs[index])
+            posts[index] = Post(
+                title=item["title"],
+                slug=slugs[index],
+                content=item["content"],
+                category_id=item.get("category"),
+                status=item.get("status", "published"),
+                author=self.request.user,
+            )
+
+        Post.objects.bulk_create(posts.values())
+        # bulk_create не отправляет сигналы - кеши и счетчики обновляем явно
+        if posts:
+            invalidate_category_directory()
+            invalidate_post_feeds({post.category_id for post in posts.values()})
+            sync_author_counters((None, post.tracked_state) for post in posts.values())
+
+        return posts
+
+    def perform_bulk_update(self, items: dict[int, Any], errors: ItemErrors) -> dict:
+        self._check_categories(items, errors)
+        own_posts = Post.objects.in_bulk(
+            [item["id"] for item in items.values()],
+        )
+        slugs = {
+            index: post_slug(item["title"])
+            for index, item in items.items()
+            if "title" in item
+        }
+        # Занятый слаг свободен только для самого поста: обмен слагами внутри
+        # пакета bulk_update одним UPDATE не переживет
+        slug_owners = dict(
+            Post.objects.filter(slug__in=set(slugs.values())).values_list("slug", "pk"),
+        )
+        used_slugs: set[str] = set()
+
+        posts: dict[int, Post] = {}
+        fields = {"updated_at"}
+        touched_categories: set[Optional[int]] = set()
+        old_states = {}
+        now = timezone.now()
+        for index, item in items.items():
+            post = own_posts.get(item["id"])
+            if post is None or post.author_id != self.request.user.id:
+                errors.setdefault(index, {"id": ["Post not found."]})
+
+            if (
+                index not in errors
+                and index in slugs
+                and (
+                    slug_owners.get(slugs[index], post.pk) != post.pk
+                    or slugs[index] in used_slugs
+                )
+            ):
+                errors[index] = {"title": ["Post with this slug already exists."]}
+
+            if index in errors:
+                continue
+
+            old_states[index] = post.tracked_state
+            touched_categories.add(post.category_id)
+            if "title" in item:
+                post.title = item["title"]
+                post.slug = slugs[index]
+                used_slugs.add(post.slug)
+                fields.update({"title", "slug"})
+
+            for field, attr in [
+                ("content", "content"),
+                ("category", "category_id"),
+                ("status", "status"),
+            ]:
+                if field in item:
+                    setattr(post, attr, item[field])
+                    fields.add(attr)
+
+            touched_categories.add(post.category_id)
+            post.updated_at = now
+            posts[index] = post
+
+        Post.objects.bulk_update(posts.values(), sorted(fields))
+        if posts:
+            invalidate_category_directory()
+            invalidate_post_feeds(touched_categories)
+            sync_author_counters(
+                (old_states[index], post.tracked_state) for index, post in posts.items()
+            )
+
+        return posts
+
+    def describe(self, instance: Post) -> dict[str, Any]:
+        return {"id": instance.pk, "slug": instance.slug}
+
+    def _check_categories(self, items: dict[int, Any], errors: ItemErrors) -> None:
+        category_ids = {item.get("category") for item in items.values()} - {None}
+        existing = set(
+            Category.objects.filter(pk__in=category_ids).values_list("pk", flat=True),
+        )
+        for index, item in items.items():
+            if item.get("category") not in existing | {None}:
+                errors[index] = {"category": ["Category not found."]}